@@ -0,0 +1,171 @@
+# _numerics.py
+# Description: Small pure-Python numeric helpers (distribution tails and dense
+# linear algebra) shared by the analysis modules. Kept dependency-free so the
+# guide keeps running on a bare Python 3.x install.
+
+import math
+
+# --- DISTRIBUTION TAILS ---
+
+def _gamma_series(a, x):
+    """Lower regularized incomplete gamma P(a, x) by its power series."""
+    term = 1.0 / a
+    total = term
+    ap = a
+    for _ in range(10000):
+        ap += 1.0
+        term *= x / ap
+        total += term
+        if abs(term) < abs(total) * 1e-15:
+            break
+    return total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def _gamma_continued_fraction(a, x):
+    """Upper regularized incomplete gamma Q(a, x) by Lentz's continued fraction."""
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        if abs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return math.exp(-x + a * math.log(x) - math.lgamma(a)) * h
+
+
+def gammaincc(a, x):
+    """Upper regularized incomplete gamma function Q(a, x)."""
+    if x <= 0.0:
+        return 1.0
+    if x < a + 1.0:
+        return max(0.0, 1.0 - _gamma_series(a, x))
+    return _gamma_continued_fraction(a, x)
+
+
+def chi2_sf(x, df):
+    """Survival function (upper tail probability) of the chi-squared distribution."""
+    if x != x:  # NaN
+        return float('nan')
+    return gammaincc(df / 2.0, x / 2.0)
+
+
+def _beta_continued_fraction(a, b, x):
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    if abs(d) < tiny:
+        d = tiny
+    d = 1.0 / d
+    h = d
+    for m in range(1, 10000):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((a + m2 - 1.0) * (a + m2))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        h *= d * c
+        aa = -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.0))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def f_sf(x, df1, df2):
+    """Survival function (upper tail probability) of the F distribution."""
+    if x != x:  # NaN
+        return float('nan')
+    if x <= 0.0:
+        return 1.0
+    return betainc(df2 / 2.0, df1 / 2.0, df2 / (df2 + df1 * x))
+
+
+def normal_sf(z):
+    """Survival function (upper tail probability) of the standard normal distribution."""
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+# --- DENSE LINEAR ALGEBRA (lists of lists) ---
+
+def cholesky(a):
+    """
+    Cholesky factor of a symmetric positive-definite matrix.
+    Args:
+        a (list): Square matrix as a list of row lists.
+    Returns:
+        list: Lower-triangular L with L L' = a.
+    Raises:
+        ValueError: If the matrix is not (numerically) positive definite.
+    """
+    n = len(a)
+    l = [[0.0] * n for _ in range(n)]
+    for j in range(n):
+        lj = l[j]
+        s = a[j][j] - sum(v * v for v in lj[:j])
+        if s <= 0.0:
+            raise ValueError("Matrix is not positive definite.")
+        ljj = math.sqrt(s)
+        lj[j] = ljj
+        for i in range(j + 1, n):
+            li = l[i]
+            li[j] = (a[i][j] - sum(li[k] * lj[k] for k in range(j))) / ljj
+    return l
+
+
+def cho_solve(l, b):
+    """Solves (L L') x = b given the Cholesky factor L from cholesky()."""
+    n = len(l)
+    y = [0.0] * n
+    for i in range(n):
+        li = l[i]
+        y[i] = (b[i] - sum(li[k] * y[k] for k in range(i))) / li[i]
+    x = [0.0] * n
+    for i in range(n - 1, -1, -1):
+        x[i] = (y[i] - sum(l[k][i] * x[k] for k in range(i + 1, n))) / l[i][i]
+    return x
+
+
+def cho_inverse(l):
+    """Inverse of (L L') given the Cholesky factor L from cholesky()."""
+    n = len(l)
+    columns = [cho_solve(l, [1.0 if i == j else 0.0 for i in range(n)]) for j in range(n)]
+    return [[columns[j][i] for j in range(n)] for i in range(n)]
+
+
+def quadratic_form(l, u):
+    """Computes u' (L L')^-1 u given the Cholesky factor L."""
+    x = cho_solve(l, u)
+    return sum(ui * xi for ui, xi in zip(u, x))
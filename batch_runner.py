@@ -0,0 +1,244 @@
+# batch_runner.py
+# Description: Sharded, resumable batch runner that pushes an archive of recorded
+# answer sequences (one per line, e.g. "a,1,3,r,n" or "a 1 3 r n") through the
+# guide's recommendation logic on all cores.
+#
+# The input file is split into byte-range shards at line boundaries. Shards are
+# handed out through a file-based work queue: a shard is claimed by atomically
+# renaming its marker from queue/ to claimed/, so any number of worker processes
+# can pull from the same directory without a coordinator. Each worker checkpoints
+# its byte offset and running counts per shard; rerunning with the same work
+# directory requeues the shards of a crashed run and resumes them from their last
+# checkpoint. Per-shard counts are merged into results.json at the end.
+#
+# Usage:
+#   python batch_runner.py answers.txt --work-dir run1 --workers 8
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+MANIFEST = 'manifest.json'
+RESULTS = 'results.json'
+STATES = ('queue', 'claimed', 'done', 'checkpoints')
+
+
+def _write_json(path, value):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        json.dump(value, handle)
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def plan_shards(path, shard_bytes):
+    """Splits a file into (start, end) byte ranges that begin and end on line boundaries."""
+    size = os.path.getsize(path)
+    shards = []
+    with open(path, 'rb') as handle:
+        start = 0
+        while start < size:
+            handle.seek(min(start + shard_bytes, size))
+            handle.readline()  # Run on to the end of the current line.
+            end = min(handle.tell(), size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+# --- WORK QUEUE ---
+
+def prepare_work_dir(input_path, work_dir, shard_bytes):
+    """
+    Creates (or resumes) a work directory for input_path.
+    A directory whose manifest matches the input (path, size, modification time)
+    is resumed: shards left in claimed/ by a crashed run go back to the queue.
+    Returns:
+        dict: The manifest.
+    Raises:
+        ValueError: If work_dir belongs to a different or modified input file.
+    """
+    stat = os.stat(input_path)
+    identity = {'input': os.path.abspath(input_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    manifest_path = os.path.join(work_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        manifest = _read_json(manifest_path)
+        if {key: manifest.get(key) for key in identity} != identity:
+            raise ValueError(f"'{work_dir}' was created for a different or modified input; use a new work directory.")
+        claimed = os.path.join(work_dir, 'claimed')
+        for name in os.listdir(claimed):
+            os.replace(os.path.join(claimed, name), os.path.join(work_dir, 'queue', name))
+        return manifest
+
+    for state in STATES:
+        os.makedirs(os.path.join(work_dir, state), exist_ok=True)
+    manifest = dict(identity, shards=plan_shards(input_path, shard_bytes))
+    for number in range(len(manifest['shards'])):
+        open(os.path.join(work_dir, 'queue', f"{number:06d}"), 'w').close()
+    _write_json(manifest_path, manifest)  # Written last: its presence marks a complete setup.
+    return manifest
+
+
+def _claim(work_dir):
+    """Atomically takes one shard from the queue. Returns its name, or None when empty."""
+    queue = os.path.join(work_dir, 'queue')
+    for name in sorted(os.listdir(queue)):
+        try:
+            os.rename(os.path.join(queue, name), os.path.join(work_dir, 'claimed', name))
+        except FileNotFoundError:  # Another worker got there first.
+            continue
+        return name
+    return None
+
+# --- WORKERS ---
+
+def _empty_counts():
+    return {'sequences': 0, 'recommended': 0, 'incomplete': 0, 'invalid': 0, 'tests': {}}
+
+
+def _classify(line, index):
+    """Returns the recommended tests for one input line, or 'incomplete' / 'invalid' / None (blank)."""
+    answers = tuple(line.decode('utf-8', 'replace').replace(',', ' ').lower().split())
+    if not answers:
+        return None
+    tests = index.leaves.get(answers)
+    if tests is not None:
+        return tests
+    return 'incomplete' if answers in index.nodes else 'invalid'
+
+
+def process_shard(input_path, work_dir, name, start, end, index, checkpoint_lines=200000):
+    """
+    Counts recommendations for one shard, resuming from its checkpoint if present.
+    The checkpoint (byte offset plus counts so far) is rewritten every
+    checkpoint_lines lines and once more when the shard is finished.
+    """
+    checkpoint_path = os.path.join(work_dir, 'checkpoints', f"{name}.json")
+    if os.path.exists(checkpoint_path):
+        checkpoint = _read_json(checkpoint_path)
+        offset, counts = checkpoint['offset'], checkpoint['counts']
+    else:
+        offset, counts = start, _empty_counts()
+    tests_counts = counts['tests']
+    memo = {}  # Archives repeat a few dozen distinct paths; classify each once.
+    since_checkpoint = 0
+    with open(input_path, 'rb') as handle:
+        handle.seek(offset)
+        while offset < end:
+            line = handle.readline()
+            if not line:
+                break
+            offset += len(line)
+            outcome = memo.get(line)
+            if outcome is None:
+                outcome = memo[line] = _classify(line, index) or ''
+            if outcome:
+                counts['sequences'] += 1
+                if isinstance(outcome, str):
+                    counts[outcome] += 1
+                else:
+                    counts['recommended'] += 1
+                    for test in outcome:
+                        tests_counts[test] = tests_counts.get(test, 0) + 1
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_lines:
+                _write_json(checkpoint_path, {'offset': offset, 'counts': counts})
+                since_checkpoint = 0
+    _write_json(checkpoint_path, {'offset': offset, 'counts': counts})
+    return counts
+
+
+def _worker(input_path, work_dir, shards, checkpoint_lines):
+    from decision_index import get_index
+    index = get_index()
+    while True:
+        name = _claim(work_dir)
+        if name is None:
+            return
+        start, end = shards[int(name)]
+        process_shard(input_path, work_dir, name, start, end, index, checkpoint_lines)
+        os.replace(os.path.join(work_dir, 'claimed', name), os.path.join(work_dir, 'done', name))
+
+
+def merge_counts(work_dir):
+    """Sums the per-shard checkpoint counts."""
+    merged = _empty_counts()
+    checkpoints = os.path.join(work_dir, 'checkpoints')
+    for name in sorted(os.listdir(checkpoints)):
+        if not name.endswith('.json'):
+            continue
+        counts = _read_json(os.path.join(checkpoints, name))['counts']
+        for key in ('sequences', 'recommended', 'incomplete', 'invalid'):
+            merged[key] += counts[key]
+        for test, count in counts['tests'].items():
+            merged['tests'][test] = merged['tests'].get(test, 0) + count
+    return merged
+
+
+def run_batch(input_path, work_dir, workers=None, shard_bytes=32 * 1024 * 1024, checkpoint_lines=200000):
+    """
+    Runs (or resumes) the whole batch and writes work_dir/results.json.
+    Args:
+        input_path (str): Text file with one answer sequence per line.
+        work_dir (str): Queue, checkpoint and result directory; reuse it to resume.
+        workers (int, optional): Worker processes; defaults to os.cpu_count().
+        shard_bytes (int): Target shard size. Several shards per worker keep
+                           the load balanced when lines vary in length.
+        checkpoint_lines (int): Lines between checkpoints.
+    Returns:
+        dict: Merged counts plus 'seconds' and 'sequences_per_second' for this run.
+    Raises:
+        RuntimeError: If a worker fails; the run can be resumed.
+    """
+    workers = workers or os.cpu_count() or 1
+    manifest = prepare_work_dir(input_path, work_dir, shard_bytes)
+    started = time.perf_counter()
+    before = merge_counts(work_dir)['sequences']
+    processes = [multiprocessing.Process(target=_worker, args=(input_path, work_dir, manifest['shards'], checkpoint_lines))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    if any(process.exitcode for process in processes):
+        raise RuntimeError(f"A worker failed; rerun with the same work directory ('{work_dir}') to resume.")
+    if os.listdir(os.path.join(work_dir, 'queue')) or os.listdir(os.path.join(work_dir, 'claimed')):
+        raise RuntimeError(f"Shards remain unprocessed; rerun with the same work directory ('{work_dir}') to resume.")
+
+    results = merge_counts(work_dir)
+    seconds = time.perf_counter() - started
+    results['workers'] = workers
+    results['shards'] = len(manifest['shards'])
+    results['seconds'] = seconds
+    results['sequences_per_second'] = (results['sequences'] - before) / seconds if seconds else 0.0
+    _write_json(os.path.join(work_dir, RESULTS), results)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count guide recommendations for an archive of answer sequences.")
+    parser.add_argument('input', help="Text file with one answer sequence per line (e.g. 'a,1,3,r,n').")
+    parser.add_argument('--work-dir', default=None, help="Queue/checkpoint directory (default: <input>.work). Reuse it to resume.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--shard-mb', type=float, default=32.0, help="Target shard size in MiB.")
+    parser.add_argument('--checkpoint-lines', type=int, default=200000, help="Lines between checkpoints.")
+    arguments = parser.parse_args(argv)
+
+    results = run_batch(arguments.input, arguments.work_dir or f"{arguments.input}.work", arguments.workers,
+                        int(arguments.shard_mb * 1024 * 1024), arguments.checkpoint_lines)
+    print(f"{results['sequences']} sequences ({results['recommended']} recommended, "
+          f"{results['incomplete']} incomplete, {results['invalid']} invalid) in {results['seconds']:.2f} s "
+          f"with {results['workers']} workers: {results['sequences_per_second']:,.0f} sequences/s")
+    for test, count in sorted(results['tests'].items(), key=lambda item: -item[1]):
+        print(f"  {count:>12}  {test}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# benchmarks.py
+# Description: Reproducible benchmark suite for the guide and the analysis
+# modules. Times scripted traversal of every decision-tree path through
+# ask_question, recommendation rendering, TEST_SUMMARIES lookups, module import
+# and script cold start, plus the data-driven checks on synthetic datasets of
+# increasing size. Results are written as JSON with machine metadata and can be
+# compared against a stored baseline, flagging regressions above a threshold.
+#
+# Usage:
+#   python benchmarks.py --output results.json
+#   python benchmarks.py --baseline baseline.json --threshold 0.25
+#   python benchmarks.py --quick --only guide
+
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULT_FORMAT = 1
+
+# --- TIMING ---
+
+def measure(function, repeat=5, number=1):
+    """Runs function number times per sample, repeat samples. Returns per-call seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'max': max(samples),
+        'repeat': repeat,
+        'number': number,
+    }
+
+# --- GUIDE BENCHMARKS ---
+
+def _leaf_paths():
+    from decision_index import get_index
+    return sorted(get_index().leaves)
+
+
+def _scripted_traversal(guide, paths):
+    """Walks every path through the real ask_question, feeding input() from a script."""
+    def run():
+        sink = io.StringIO()
+        saved_input = builtins.input
+        try:
+            with contextlib.redirect_stdout(sink):
+                for path in paths:
+                    answers = iter(path)
+                    builtins.input = lambda prompt='': next(answers)
+                    section = guide.ask_question(guide.MAIN_QUESTION, guide.MAIN_OPTIONS)
+                    getattr(guide, f"handle_section_{section}")()
+        finally:
+            builtins.input = saved_input
+    return run
+
+
+def _render_all(guide, recommendations):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for tests in recommendations:
+                guide.print_recommendation(list(tests))
+    return run
+
+
+def _summary_lookups(guide):
+    keys = list(guide.TEST_SUMMARIES) + ["Not a test"]
+
+    def run():
+        get = guide.TEST_SUMMARIES.get
+        for _ in range(100):
+            for key in keys:
+                get(key)
+    return run
+
+
+def _subprocess(arguments, stdin=''):
+    def run():
+        subprocess.run([sys.executable] + arguments, input=stdin, capture_output=True,
+                       text=True, cwd=HERE, check=True)
+    return run
+
+
+def guide_benchmarks(quick=False):
+    import statistical_tests_guide as guide
+    from decision_index import get_index
+    paths = _leaf_paths()
+    recommendations = [get_index().recommendation(path) for path in paths]
+    repeat = 3 if quick else 7
+    cold_path = paths[0]
+    yield 'guide.traversal_all_paths', {'paths': len(paths)}, measure(_scripted_traversal(guide, paths), repeat, 20)
+    yield 'guide.render_all_recommendations', {'paths': len(paths)}, measure(_render_all(guide, recommendations), repeat, 20)
+    yield 'guide.summary_lookups_x100', {'keys': len(guide.TEST_SUMMARIES) + 1}, measure(_summary_lookups(guide), repeat, 20)
+    yield 'guide.import', {}, measure(_subprocess(['-c', 'import statistical_tests_guide']), repeat)
+    yield 'guide.cold_start_session', {'path': '/'.join(cold_path)}, measure(
+        _subprocess(['statistical_tests_guide.py'], '\n'.join(cold_path) + '\n\n'), repeat)
+
+# --- DATA-DRIVEN CHECKS ---
+
+def data_benchmarks(sizes, quick=False):
+    import survival_analysis
+    import variance_tests
+    import overdispersion
+    import model_comparison
+    import sequential_testing
+    import result_cache
+    repeat = 1 if quick else 3
+    for n in sizes:
+        rng = random.Random(n)
+        times, events, groups, strata, covariates = survival_analysis._synthetic_cohort(n)
+        yield 'survival.logrank', {'n': n}, measure(lambda: survival_analysis.logrank_test(times, events, groups, strata), repeat)
+        yield 'survival.cox_fit', {'n': n}, measure(lambda: survival_analysis.cox_ph(times, events, covariates, strata), repeat)
+
+        columns = 50
+        matrix = [[rng.gauss(0.0, 1.0 + (i % 3)) for _ in range(columns)] for i in range(n)]
+        labels = [i % 3 for i in range(n)]
+        yield 'variance.batch_50_columns', {'n': n}, measure(lambda: variance_tests.batch_variance_tests(matrix, labels), repeat)
+
+        counts = [float(rng.randrange(6)) for _ in range(n)]
+        rows = [[c[0]] for c in covariates]
+        source = lambda: ((counts[i:i + 10000], rows[i:i + 10000]) for i in range(0, n, 10000))
+        yield 'overdispersion.poisson_irls', {'n': n}, measure(lambda: overdispersion.diagnose_overdispersion(source), repeat)
+
+        y, restricted, full = model_comparison._synthetic_pairs(1, n, 'binomial')[0]
+        yield 'model_comparison.binomial_pair', {'n': n}, measure(lambda: model_comparison.compare_nested(y, restricted, full), repeat)
+
+        experiment_events = [(rng.randrange(1000), rng.randrange(2), rng.random() < 0.1) for _ in range(n)]
+
+        def sequential():
+            experiments = sequential_testing.SequentialExperiments()
+            experiments.new_experiments(1000)
+            experiments.record_batch(experiment_events)
+        yield 'sequential.record_events', {'n': n}, measure(sequential, repeat)
+
+        values = [rng.gauss(0.0, 1.0) for _ in range(n)]
+        yield 'result_cache.fingerprint', {'n': n}, measure(lambda: result_cache.fingerprint(values, labels), repeat)
+
+# --- RESULTS AND BASELINES ---
+
+def machine_metadata():
+    metadata = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+    try:
+        metadata['git_commit'] = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                                text=True, cwd=HERE, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        metadata['git_commit'] = None
+    return metadata
+
+
+def result_key(name, params):
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in sorted(params.items()))}]"
+
+
+def run_suite(groups=('guide', 'data'), sizes=(1000, 10000), quick=False, progress=None):
+    """Runs the selected benchmark groups. Returns the results document."""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    results = {}
+    runners = {'guide': lambda: guide_benchmarks(quick), 'data': lambda: data_benchmarks(sizes, quick)}
+    for group in groups:
+        for name, params, timing in runners[group]():
+            key = result_key(name, params)
+            results[key] = dict(timing, name=name, params=params)
+            if progress:
+                progress(key, timing)
+    return {'format': RESULT_FORMAT, 'machine': machine_metadata(), 'results': results}
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Compares median timings with a baseline document.
+    Returns:
+        list: (key, baseline_median, current_median, ratio) for every benchmark
+              slower than baseline by more than threshold (0.2 = 20%).
+    """
+    regressions = []
+    for key, timing in current['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or previous['median'] <= 0.0:
+            continue
+        ratio = timing['median'] / previous['median']
+        if ratio > 1.0 + threshold:
+            regressions.append((key, previous['median'], timing['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the statistical tests guide.")
+    parser.add_argument('--output', help="Write results JSON to this file.")
+    parser.add_argument('--baseline', help="Compare against this results JSON.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before flagging (default 0.2 = 20%%).")
+    parser.add_argument('--sizes', type=int, nargs='+', default=None, help="Synthetic dataset sizes.")
+    parser.add_argument('--only', choices=('guide', 'data'), help="Run one benchmark group.")
+    parser.add_argument('--quick', action='store_true', help="Fewer repeats and small sizes (smoke test).")
+    arguments = parser.parse_args(argv)
+
+    sizes = arguments.sizes or ((500, 2000) if arguments.quick else (1000, 10000, 50000))
+    groups = (arguments.only,) if arguments.only else ('guide', 'data')
+    document = run_suite(groups, sizes, arguments.quick,
+                         progress=lambda key, timing: print(f"{key:<55} {timing['median'] * 1000:>12.3f} ms"))
+    if arguments.output:
+        with open(arguments.output, 'w', encoding='utf-8') as handle:
+            json.dump(document, handle, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        regressions = compare(document, baseline, arguments.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {arguments.threshold:.0%}:")
+            for key, before, after, ratio in regressions:
+                print(f"  {key}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions beyond {arguments.threshold:.0%} against {arguments.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
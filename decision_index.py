@@ -0,0 +1,213 @@
+# decision_index.py
+# Description: Precomputed reachability index over the guide's decision tree.
+# The tree is recovered once from the section handlers themselves (by replaying
+# every answer prefix with scripted answers), so the if/elif chains in
+# statistical_tests_guide.py stay the single source of truth. The index then
+# answers, by dictionary lookup:
+#   * which tests are still reachable after a partial list of answers (bitset),
+#   * which answer paths lead to a given test,
+#   * which test(s) a complete answer path recommends.
+
+import sys
+import threading
+import types
+
+_index_lock = threading.Lock()
+
+
+class _PendingQuestion(Exception):
+    """Raised by the scripted ask_question when the answers run out."""
+
+    def __init__(self, prompt, options):
+        super().__init__(prompt)
+        self.prompt = prompt
+        self.options = options
+
+
+def replay(answers, module=None):
+    """
+    Runs the guide non-interactively on a sequence of answers.
+    Args:
+        answers (sequence): Option keys, starting with the main question's.
+        module (module, optional): The guide module (defaults to statistical_tests_guide).
+    Returns:
+        tuple: ('question', prompt, options) if more answers are needed, or
+               ('recommendation', tests, notes) if the path is complete.
+    Raises:
+        ValueError: If an answer is not a valid option of its question.
+    """
+    if module is None:
+        import statistical_tests_guide as module
+    pending = iter(answers)
+    tests, collected_notes = [], []
+
+    def ask_question(prompt, options):
+        choice = next(pending, None)
+        if choice is None:
+            raise _PendingQuestion(prompt, options)
+        if choice not in options:
+            raise ValueError(f"Invalid answer '{choice}' to '{prompt}'. Choose from: {', '.join(options)}")
+        return choice
+
+    def print_recommendation(recommended, notes=None):
+        tests.extend([recommended] if isinstance(recommended, str) else recommended or ())
+        if notes:
+            collected_notes.append(notes)
+        return True
+
+    try:
+        section = ask_question(module.MAIN_QUESTION, module.MAIN_OPTIONS)
+        handler = getattr(module, f"handle_section_{section}")
+        handler = getattr(handler, '__wrapped__', handler)  # Skip instrumentation wrappers.
+        # Run the handler's code against a private copy of the module globals, so the
+        # scripted functions are never visible to live sessions using the module.
+        scripted_globals = dict(vars(module), ask_question=ask_question, print_recommendation=print_recommendation)
+        types.FunctionType(handler.__code__, scripted_globals, handler.__name__,
+                           handler.__defaults__, handler.__closure__)()
+    except _PendingQuestion as question:
+        return 'question', question.prompt, question.options
+    return 'recommendation', tests, collected_notes
+
+
+def build_decision_tree(module=None, answers=()):
+    """
+    Recovers the decision tree below a given answer prefix.
+    Returns:
+        dict: Internal nodes are {'prompt', 'options', 'children': {choice: node}};
+              leaves are {'tests': [...], 'notes': [...]}. Plain data, so the
+              tree can be serialized as JSON.
+    """
+    kind, first, second = replay(answers, module)
+    if kind == 'recommendation':
+        return {'tests': first, 'notes': second}
+    return {
+        'prompt': first,
+        'options': dict(second),
+        'children': {choice: build_decision_tree(module, tuple(answers) + (choice,)) for choice in second},
+    }
+
+
+class DecisionIndex:
+    """Constant-time reachability and reverse-path lookups over a decision tree."""
+
+    def __init__(self, tree, test_names=()):
+        """
+        Args:
+            tree (dict): A tree from build_decision_tree().
+            test_names (iterable): Known test names fixing the bit order (normally
+                                   the TEST_SUMMARIES keys); tests found only in the
+                                   tree are appended.
+        """
+        self.tree = tree
+        self.test_names = list(test_names)
+        self.bits = {name: 1 << i for i, name in enumerate(self.test_names)}
+        self.nodes = {}
+        self.reachable = {}
+        self.leaves = {}
+        self.paths = {}
+        self._names = {}
+        self._index(tree, ())
+        self.paths = {name: tuple(paths) for name, paths in self.paths.items()}
+
+    def _bit(self, name):
+        bit = self.bits.get(name)
+        if bit is None:
+            bit = self.bits[name] = 1 << len(self.test_names)
+            self.test_names.append(name)
+        return bit
+
+    def _index(self, node, answers):
+        self.nodes[answers] = node
+        if 'tests' in node:
+            tests = tuple(node['tests'])
+            self.leaves[answers] = tests
+            mask = 0
+            for name in tests:
+                mask |= self._bit(name)
+                self.paths.setdefault(name, []).append(answers)
+        else:
+            mask = 0
+            for choice, child in node['children'].items():
+                mask |= self._index(child, answers + (choice,))
+        self.reachable[answers] = mask
+        self._names[answers] = self.decode(mask)
+        return mask
+
+    def decode(self, mask):
+        """Test names for the bits set in mask, in bit order."""
+        return tuple(name for name, bit in self.bits.items() if mask & bit)
+
+    def remaining_mask(self, answers):
+        """Bitset of tests still reachable after a partial answer path."""
+        return self.reachable[tuple(answers)]
+
+    def remaining_tests(self, answers):
+        """Names of tests still reachable after a partial answer path."""
+        return self._names[tuple(answers)]
+
+    def next_question(self, answers):
+        """(prompt, options) of the next question, or None if the path is complete."""
+        node = self.nodes[tuple(answers)]
+        return None if 'tests' in node else (node['prompt'], node['options'])
+
+    def recommendation(self, answers):
+        """Tests recommended by a complete answer path, or None if it is partial or invalid."""
+        return self.leaves.get(tuple(answers))
+
+    def paths_to(self, test_name):
+        """
+        All answer paths that recommend a test. An exact TEST_SUMMARIES key is
+        looked up directly; otherwise test_name may be the test's number ("13"
+        or "13.") or its name without the trailing parentheticals ("13. Friedman
+        Test"), case-insensitively.
+        Returns:
+            tuple: Answer paths (empty if no test matches).
+        Raises:
+            ValueError: If test_name matches more than one test (e.g. "23" covers
+                        the one- and two-sample Z-tests for proportions).
+        """
+        paths = self.paths.get(test_name)
+        if paths is not None:
+            return paths
+        query = test_name.strip().casefold()
+        matches = [name for name in self.paths if query in _short_names(name)]
+        if len(matches) > 1:
+            raise ValueError(f"'{test_name}' matches several tests: {'; '.join(matches)}. Use the full name.")
+        return self.paths[matches[0]] if matches else ()
+
+
+def _short_names(name):
+    """Case-folded ways to refer to a test: its full name, number and name without trailing '(...)'."""
+    number = name.partition('. ')[0]
+    names = {name, number, number + '.'}
+    while name.endswith(')') and ' (' in name:
+        name = name[:name.rindex(' (')]
+        names.add(name)
+    return {short.casefold() for short in names}
+
+
+_INDEX = None
+
+
+def get_index():
+    """The index for the installed guide, built on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _index_lock:
+            if _INDEX is None:
+                import statistical_tests_guide as guide
+                _INDEX = DecisionIndex(build_decision_tree(guide), guide.TEST_SUMMARIES)
+    return _INDEX
+
+
+if __name__ == "__main__":
+    index = get_index()
+    for test_name in sys.argv[1:] or index.test_names:
+        try:
+            paths = index.paths_to(test_name)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            continue
+        print(test_name)
+        for path in paths:
+            print(f"  {' -> '.join(path)}")
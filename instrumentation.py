@@ -0,0 +1,317 @@
+# instrumentation.py
+# Description: Opt-in metrics for guide sessions. enable() swaps timing wrappers
+# in for ask_question, print_recommendation, guide_to_statistical_test and every
+# handle_section_* function; disable() puts the originals back, so a disabled
+# guide runs exactly the uninstrumented code. Counters live in per-thread shards
+# (each thread only ever writes its own) and are merged when exported in the
+# Prometheus text format, to a file or a local HTTP endpoint.
+
+import bisect
+import cProfile
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets. Questions are answered
+# by people, so the range covers think time rather than CPU time.
+LATENCY_BUCKETS = (0.005, 0.05, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_HELP = {
+    'statguide_sessions_total': ('counter', "Guide sessions started."),
+    'statguide_question_seconds': ('histogram', "Time from showing a question to a valid answer."),
+    'statguide_answers_total': ('counter', "Answers given, by question and choice (branch hits)."),
+    'statguide_abandoned_total': ('counter', "Sessions abandoned with 'q', by question."),
+    'statguide_section_total': ('counter', "Section handler calls."),
+    'statguide_section_seconds': ('histogram', "Time spent inside each section handler."),
+    'statguide_time_to_recommendation_seconds': ('histogram', "Time from session start to the first recommendation."),
+    'statguide_render_seconds': ('histogram', "Time spent rendering a recommendation."),
+    'statguide_recommendations_total': ('counter', "Times each TEST_SUMMARIES key was recommended."),
+}
+
+
+class MetricsRegistry:
+    """Per-thread counter and histogram shards, merged on demand."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # Only taken the first time a thread records.
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = ({}, {})
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def inc(self, name, labels=(), amount=1):
+        counters = self._shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard()[1]
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+        entry[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        entry[1] += seconds
+
+    def snapshot(self):
+        """Merges every thread's shard. Returns (counters, histograms)."""
+        counters, histograms = {}, {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard_counters, shard_histograms in shards:
+            for key, value in list(shard_counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, (buckets, total) in list(shard_histograms.items()):
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+        return counters, histograms
+
+    def reset(self):
+        with self._lock:
+            self._shards = []
+        self._local = threading.local()
+
+
+REGISTRY = MetricsRegistry()
+
+# --- PROMETHEUS EXPORT ---
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+_LABEL_NAMES = {
+    'statguide_question_seconds': ('question',),
+    'statguide_answers_total': ('question', 'choice'),
+    'statguide_abandoned_total': ('question',),
+    'statguide_section_total': ('section',),
+    'statguide_section_seconds': ('section',),
+    'statguide_recommendations_total': ('test',),
+}
+
+
+def render_prometheus(registry=REGISTRY):
+    """Returns the merged metrics in the Prometheus text exposition format."""
+    counters, histograms = registry.snapshot()
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        label_names = _LABEL_NAMES.get(name, ())
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(label_names, labels)} {value}")
+        else:
+            for (metric, labels), (buckets, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(label_names, labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(label_names, labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(label_names, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, registry=REGISTRY):
+    """Writes the metrics to path atomically (for node_exporter's textfile collector)."""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        handle.write(render_prometheus(registry))
+    os.replace(temporary, path)
+
+
+def serve_prometheus(port=9464, host='127.0.0.1', registry=REGISTRY):
+    """Serves /metrics on a local port from a daemon thread. Returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus(registry).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='statguide-metrics', daemon=True).start()
+    return server
+
+
+def start_periodic_export(path, interval=15.0, registry=REGISTRY):
+    """Aggregates and rewrites the metrics file every interval seconds. Returns a stop event."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            write_prometheus(path, registry)
+
+    threading.Thread(target=loop, name='statguide-metrics-export', daemon=True).start()
+    return stop
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """Runs the enclosed block under cProfile and dumps pstats-compatible output to path."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+# --- WRAPPERS ---
+
+_session = threading.local()
+_originals = {}
+
+
+def _wrap_ask_question(original, registry):
+    @functools.wraps(original)
+    def ask_question(prompt, options):
+        start = time.perf_counter()
+        if getattr(_session, 'start', None) is None:
+            _session.start = start
+            _session.recommended = False
+        try:
+            choice = original(prompt, options)
+        except SystemExit:
+            registry.inc('statguide_abandoned_total', (prompt,))
+            _session.start = None
+            raise
+        registry.observe('statguide_question_seconds', (prompt,), time.perf_counter() - start)
+        registry.inc('statguide_answers_total', (prompt, choice))
+        return choice
+    return ask_question
+
+
+def _wrap_print_recommendation(original, registry):
+    @functools.wraps(original)
+    def print_recommendation(tests, notes=None):
+        start = time.perf_counter()
+        result = original(tests, notes)
+        end = time.perf_counter()
+        registry.observe('statguide_render_seconds', (), end - start)
+        for test in [tests] if isinstance(tests, str) else tests or ():
+            registry.inc('statguide_recommendations_total', (test,))
+        session_start = getattr(_session, 'start', None)
+        if session_start is not None and not _session.recommended:
+            _session.recommended = True
+            registry.observe('statguide_time_to_recommendation_seconds', (), start - session_start)
+        return result
+    return print_recommendation
+
+
+def _wrap_section(original, section, registry):
+    @functools.wraps(original)
+    def handle_section():
+        registry.inc('statguide_section_total', (section,))
+        start = time.perf_counter()
+        try:
+            return original()
+        finally:
+            registry.observe('statguide_section_seconds', (section,), time.perf_counter() - start)
+    return handle_section
+
+
+def _wrap_guide(original, registry):
+    @functools.wraps(original)
+    def guide_to_statistical_test():
+        registry.inc('statguide_sessions_total')
+        _session.start = time.perf_counter()
+        _session.recommended = False
+        try:
+            return original()
+        finally:
+            _session.start = None
+    return guide_to_statistical_test
+
+
+def enable(module=None, registry=REGISTRY):
+    """
+    Installs the timing wrappers on the guide module.
+    Args:
+        module (module, optional): The guide module; defaults to statistical_tests_guide
+                                   (pass sys.modules['__main__'] when run as a script).
+        registry (MetricsRegistry): Where the metrics are recorded.
+    """
+    if module is None:
+        import statistical_tests_guide as module
+    if module in _originals:
+        return
+    originals = {name: getattr(module, name) for name in dir(module)
+                 if name.startswith('handle_section_') or name in
+                 ('ask_question', 'print_recommendation', 'guide_to_statistical_test')}
+    _originals[module] = originals
+    for name, function in originals.items():
+        if name == 'ask_question':
+            wrapper = _wrap_ask_question(function, registry)
+        elif name == 'print_recommendation':
+            wrapper = _wrap_print_recommendation(function, registry)
+        elif name == 'guide_to_statistical_test':
+            wrapper = _wrap_guide(function, registry)
+        else:
+            wrapper = _wrap_section(function, name[len('handle_section_'):], registry)
+        setattr(module, name, wrapper)
+
+
+def disable(module=None):
+    """Restores the original, uninstrumented functions."""
+    if module is None:
+        module = sys.modules.get('statistical_tests_guide')
+    for name, function in _originals.pop(module, {}).items():
+        setattr(module, name, function)
+
+
+def enable_from_environment(module=None):
+    """
+    Enables instrumentation from environment variables:
+        STAT_GUIDE_METRICS_FILE: Prometheus text file, rewritten every
+                                 STAT_GUIDE_METRICS_INTERVAL seconds (default 15)
+                                 and once more at exit.
+        STAT_GUIDE_METRICS_PORT: Local port serving the metrics over HTTP.
+        STAT_GUIDE_PROFILE: cProfile output file written at exit (load with pstats).
+    Returns:
+        bool: True if anything was enabled.
+    """
+    import atexit
+    path = os.environ.get('STAT_GUIDE_METRICS_FILE')
+    port = os.environ.get('STAT_GUIDE_METRICS_PORT')
+    profile_path = os.environ.get('STAT_GUIDE_PROFILE')
+    if path or port:
+        enable(module)
+    if port:
+        serve_prometheus(int(port))
+    if path:
+        stop = start_periodic_export(path, float(os.environ.get('STAT_GUIDE_METRICS_INTERVAL', 15)))
+        atexit.register(lambda: (stop.set(), write_prometheus(path)))
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(lambda: (profiler.disable(), profiler.dump_stats(profile_path)))
+    return bool(path or port or profile_path)
@@ -0,0 +1,271 @@
+# knowledge_base.py
+# Description: Hot-reloadable knowledge base for long-running workers. The test
+# summaries and the decision tree are exported to (and loaded from) a versioned
+# JSON file. A KnowledgeBaseStore keeps a reference to the current immutable
+# KnowledgeBase and swaps it atomically when the file changes; sessions hold on
+# to the snapshot they started with, so in-flight sessions finish on their own
+# version. Rendered summaries and the reachability index are carried over from
+# the previous version for every entry whose content hash did not change.
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+FORMAT = 1
+
+
+def content_hash(value):
+    """Stable SHA-256 of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def document_from_guide(version, module=None):
+    """Builds a knowledge-base document from the built-in TEST_SUMMARIES and section handlers."""
+    from decision_index import build_decision_tree
+    if module is None:
+        import statistical_tests_guide as module
+    return {
+        'format': FORMAT,
+        'version': str(version),
+        'tests': module.TEST_SUMMARIES,
+        'tree': build_decision_tree(module),
+    }
+
+
+def export_knowledge_base(path, version, module=None):
+    """Writes the built-in knowledge base to path atomically, so watchers never read half a file."""
+    document = document_from_guide(version, module)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        json.dump(document, handle, ensure_ascii=False, indent=1)
+    os.replace(temporary, path)
+    return document
+
+
+def _check_tree(node, path=()):
+    where = ' -> '.join(path) or 'root'
+    if not isinstance(node, dict):
+        raise ValueError(f"Tree node at {where} is not an object")
+    if 'tests' in node:
+        if not isinstance(node['tests'], list) or not all(isinstance(name, str) for name in node['tests']):
+            raise ValueError(f"Leaf at {where} needs a list of test names in 'tests'")
+        if not isinstance(node.get('notes') or [], list):
+            raise ValueError(f"Leaf at {where} has 'notes' that is not a list")
+        return
+    options, children = node.get('options'), node.get('children')
+    if not isinstance(node.get('prompt'), str) or not isinstance(options, dict) or not isinstance(children, dict):
+        raise ValueError(f"Question at {where} needs 'prompt', 'options' and 'children'")
+    if set(options) != set(children):
+        raise ValueError(f"Question at {where} has options without children or children without options")
+    for choice, child in children.items():
+        _check_tree(child, path + (choice,))
+
+
+def check_document(document):
+    """
+    Validates the shape of a parsed knowledge-base file.
+    Raises:
+        ValueError: If the format is unsupported or any field is missing or malformed.
+    """
+    if not isinstance(document, dict):
+        raise ValueError("Knowledge base must be a JSON object")
+    if document.get('format') != FORMAT:
+        raise ValueError(f"Unsupported knowledge base format: {document.get('format')!r}")
+    for key in ('version', 'tests', 'tree'):
+        if key not in document:
+            raise ValueError(f"Knowledge base is missing '{key}'")
+    tests = document['tests']
+    if not isinstance(tests, dict):
+        raise ValueError("Knowledge base 'tests' must be an object")
+    for name, summary in tests.items():
+        if not isinstance(summary, dict) or not isinstance(summary.get('assumptions', []), list):
+            raise ValueError(f"Summary for '{name}' must be an object with an 'assumptions' list")
+    _check_tree(document['tree'])
+
+
+class KnowledgeBase:
+    """One immutable version of the test summaries and decision tree."""
+
+    def __init__(self, document, previous=None):
+        """
+        Args:
+            document (dict): Parsed knowledge-base file ('format', 'version', 'tests', 'tree').
+            previous (KnowledgeBase, optional): The version being replaced; its rendered
+                                                entries and index are reused where unchanged.
+        Raises:
+            ValueError: If the document fails check_document().
+        """
+        from statistical_tests_guide import format_test_summary
+        from decision_index import DecisionIndex
+        check_document(document)
+        self.version = document['version']
+        self.tests = document['tests']
+        self.tree = document['tree']
+        self.document_hash = content_hash(document)
+
+        self.entry_hashes = {name: content_hash(summary) for name, summary in self.tests.items()}
+        self.rendered = {}
+        self.changed_entries = []
+        for name, summary in self.tests.items():
+            if previous is not None and previous.entry_hashes.get(name) == self.entry_hashes[name]:
+                self.rendered[name] = previous.rendered[name]
+            else:
+                self.rendered[name] = format_test_summary(name, summary)
+                self.changed_entries.append(name)
+
+        self.tree_hash = content_hash(self.tree)
+        if (previous is not None and previous.tree_hash == self.tree_hash
+                and list(previous.tests) == list(self.tests)):
+            self.index = previous.index
+            self.reindexed = False
+        else:
+            self.index = DecisionIndex(self.tree, self.tests)
+            self.reindexed = True
+
+    def format_recommendation(self, tests, notes=None):
+        """The recommendation block for tests, rendered from this version."""
+        from statistical_tests_guide import format_recommendation
+        return format_recommendation(tests, notes, summaries=self.tests, rendered=self.rendered)
+
+
+def load_knowledge_base(path, previous=None):
+    """Reads and indexes a knowledge-base file. See KnowledgeBase for reuse of previous."""
+    with open(path, encoding='utf-8') as handle:
+        return KnowledgeBase(json.load(handle), previous)
+
+
+class Session:
+    """A guide session pinned to the knowledge-base version it started on."""
+
+    def __init__(self, knowledge_base):
+        self.knowledge_base = knowledge_base
+        self.answers = []
+
+    @property
+    def version(self):
+        return self.knowledge_base.version
+
+    def next_question(self):
+        """(prompt, options) of the next question, or None once a recommendation is reached."""
+        return self.knowledge_base.index.next_question(self.answers)
+
+    def answer(self, choice):
+        """Records an answer to the current question."""
+        question = self.next_question()
+        if question is None:
+            raise ValueError("The session has already reached a recommendation.")
+        if choice not in question[1]:
+            raise ValueError(f"Invalid answer '{choice}'. Choose from: {', '.join(question[1])}")
+        self.answers.append(choice)
+
+    def remaining_tests(self):
+        return self.knowledge_base.index.remaining_tests(self.answers)
+
+    def recommendation(self):
+        """(tests, notes) for a completed session, or None while questions remain."""
+        node = self.knowledge_base.index.nodes[tuple(self.answers)]
+        if 'tests' not in node:
+            return None
+        return node['tests'], ' '.join(node.get('notes') or ()) or None
+
+    def render(self):
+        """The recommendation block for a completed session."""
+        tests, notes = self.recommendation()
+        return self.knowledge_base.format_recommendation(tests, notes)
+
+
+class KnowledgeBaseStore:
+    """Holds the current KnowledgeBase and swaps in new versions of its file."""
+
+    def __init__(self, path, poll_interval=2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self.current = load_knowledge_base(path)
+        self._checked = time.monotonic()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def reload(self):
+        """
+        Loads the file if it changed since the last check and swaps the reference.
+        A file that fails to load leaves the current version in place (see last_error).
+        Returns:
+            bool: True if a new version was installed.
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                stamp = self._file_stamp()
+                if stamp == self._stamp:
+                    return False
+                candidate = load_knowledge_base(self.path, previous=self.current)
+            except (OSError, ValueError) as error:
+                self.last_error = error
+                return False
+            self._stamp = stamp
+            self.last_error = None
+            if candidate.document_hash == self.current.document_hash:
+                return False
+            self.current = candidate  # A single reference assignment: readers see old or new, never a mix.
+            return True
+
+    def maybe_reload(self):
+        """reload(), at most once per poll_interval; cheap enough to call per request."""
+        if time.monotonic() - self._checked >= self.poll_interval:
+            return self.reload()
+        return False
+
+    def start_watcher(self):
+        """
+        Polls the file from a daemon thread. Returns an Event that stops it.
+        Errors are recorded in last_error and never end the thread.
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(self.poll_interval):
+                try:
+                    self.reload()
+                except Exception as error:  # Keep watching; a later version may load.
+                    self.last_error = error
+
+        threading.Thread(target=loop, name='statguide-kb-watcher', daemon=True).start()
+        return stop
+
+    def new_session(self):
+        return Session(self.current)
+
+
+def run_interactive(knowledge_base):
+    """Runs one console session driven entirely by a loaded knowledge base."""
+    from statistical_tests_guide import ask_question
+    session = Session(knowledge_base)
+    question = session.next_question()
+    while question is not None:
+        session.answer(ask_question(*question))
+        question = session.next_question()
+    print(session.render())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or run the guide's knowledge base file.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="Write the built-in knowledge base to a file.")
+    export_parser.add_argument('path')
+    export_parser.add_argument('version')
+    run_parser = commands.add_parser('run', help="Run one interactive session from a knowledge base file.")
+    run_parser.add_argument('path')
+    arguments = parser.parse_args()
+    if arguments.command == 'export':
+        export_knowledge_base(arguments.path, arguments.version)
+    else:
+        run_interactive(load_knowledge_base(arguments.path))
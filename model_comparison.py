@@ -0,0 +1,313 @@
+# model_comparison.py
+# Description: Bulk runner for the Section H recommendations ("48. Likelihood
+# Ratio Test (LRT)", "49. Wald Test" and "50. Score Test (Lagrange Multiplier
+# Test)") on batches of nested (restricted, full) GLM design-matrix pairs.
+# Within a pair the restricted model's columns come first, so everything
+# computed for them (the leading Cholesky block, a full-width pass at the
+# restricted estimate) is reused by the full model. Independent pairs are
+# spread over a process pool.
+
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from _numerics import chi2_sf, cholesky, cho_solve, cho_inverse, quadratic_form
+
+FAMILIES = ('gaussian', 'binomial', 'poisson')
+
+
+def _align_columns(restricted, full):
+    """
+    Reorders the full design so the restricted model's columns come first.
+    Returns (rows, q) where q is the number of shared (restricted) columns.
+    """
+    full_columns = list(zip(*full))
+    positions = {}
+    for j, column in enumerate(full_columns):
+        positions.setdefault(column, []).append(j)
+    order = []
+    for column in zip(*restricted):
+        if not positions.get(column):
+            raise ValueError("The restricted design is not nested in the full design.")
+        order.append(positions[column].pop(0))
+    q = len(order)
+    taken = set(order)
+    order.extend(j for j in range(len(full_columns)) if j not in taken)
+    if len(order) == q:
+        raise ValueError("The full design adds no columns to the restricted design.")
+    return [[row[j] for j in order] for row in full], q
+
+
+def _result(loglik_restricted, loglik_full, lrt, wald, score, df, fits=((True, 0), (True, 0))):
+    (converged_restricted, iterations_restricted), (converged_full, iterations_full) = fits
+    return {
+        'loglik_restricted': loglik_restricted,
+        'loglik_full': loglik_full,
+        'converged': converged_restricted and converged_full,
+        'converged_restricted': converged_restricted,
+        'converged_full': converged_full,
+        'iterations_restricted': iterations_restricted,
+        'iterations_full': iterations_full,
+        'df': df,
+        'lrt': lrt,
+        'lrt_p': chi2_sf(lrt, df),
+        'wald': wald,
+        'wald_p': chi2_sf(wald, df),
+        'score': score,
+        'score_p': chi2_sf(score, df),
+    }
+
+# --- GAUSSIAN (LINEAR) MODELS: ONE FACTORIZATION FOR BOTH FITS ---
+
+def _compare_gaussian(y, x, q):
+    """
+    Cholesky of the augmented Gram matrix [X y]'[X y]. Its last row holds the
+    projections of y on each successive column, so the residual sum of squares
+    of the restricted (leading q columns) and full models both fall out of the
+    same factor.
+    """
+    n = len(y)
+    p = len(x[0])
+    gram = [[0.0] * (p + 1) for _ in range(p + 1)]
+    for row, yi in zip(x, y):
+        z = list(row) + [yi]
+        for a in range(p + 1):
+            za = z[a]
+            target = gram[a]
+            for c in range(a + 1):
+                target[c] += za * z[c]
+    for a in range(p + 1):
+        for c in range(a):
+            gram[c][a] = gram[a][c]
+    last = cholesky(gram)[p]
+    rss_full = last[p] ** 2
+    rss_restricted = rss_full + sum(v * v for v in last[q:p])
+
+    def loglik(rss):
+        return -0.5 * n * (math.log(2.0 * math.pi * rss / n) + 1.0)
+
+    # Maximum-likelihood versions of the trinity (Wald >= LRT >= Score).
+    return _result(loglik(rss_restricted), loglik(rss_full),
+                   lrt=n * math.log(rss_restricted / rss_full),
+                   wald=n * (rss_restricted - rss_full) / rss_full,
+                   score=n * (rss_restricted - rss_full) / rss_restricted,
+                   df=p - q)
+
+# --- BINOMIAL (LOGIT) AND POISSON (LOG) MODELS ---
+
+def _glm_pass(x, y, beta, family, ncols=None):
+    """
+    Evaluates a canonical-link GLM at beta over the leading ncols columns of x
+    (all columns by default); coefficients beyond ncols are taken to be zero.
+    Returns (information X'WX, X'Wz, score X'(y - mu), loglik), ncols wide.
+    """
+    p = len(x[0]) if ncols is None else ncols
+    coef = beta[:p]
+    info = [[0.0] * p for _ in range(p)]
+    xtwz = [0.0] * p
+    score = [0.0] * p
+    loglik = 0.0
+    for row, yi in zip(x, y):
+        eta = sum(b * v for b, v in zip(coef, row))
+        if family == 'binomial':
+            if eta >= 0.0:
+                mu = 1.0 / (1.0 + math.exp(-eta))
+                loglik += yi * eta - eta - math.log1p(math.exp(-eta))
+            else:
+                e = math.exp(eta)
+                mu = e / (1.0 + e)
+                loglik += yi * eta - math.log1p(e)
+            w = max(mu * (1.0 - mu), 1e-12)
+        else:
+            mu = math.exp(eta)
+            loglik += yi * eta - mu - math.lgamma(yi + 1.0)
+            w = mu
+        resid = yi - mu
+        z = eta + resid / w
+        for a in range(p):
+            xa = row[a]
+            wa = w * xa
+            xtwz[a] += wa * z
+            score[a] += xa * resid
+            target = info[a]
+            for c in range(a + 1):
+                target[c] += wa * row[c]
+    for a in range(p):
+        for c in range(a):
+            info[c][a] = info[a][c]
+    return info, xtwz, score, loglik
+
+
+def _irls(x, y, family, ncols, beta, state, max_iter, tol):
+    """
+    IRLS on the leading ncols columns, starting from beta (padded with zeros to
+    all columns) whose ncols-wide pass over x is already in state.
+    Returns (beta, state, converged, iterations) with state evaluated at the
+    returned beta, ncols wide.
+    """
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        info, xtwz, _, loglik = state
+        lead = [row[:ncols] for row in info[:ncols]]
+        step = cho_solve(cholesky(lead), xtwz[:ncols])
+        trial = step + [0.0] * (len(beta) - ncols)
+        trial_state = _glm_pass(x, y, trial, family, ncols)
+        converged = abs(trial_state[3] - loglik) <= tol * (abs(loglik) + tol)
+        beta, state = trial, trial_state
+        if converged:
+            break
+    return beta, state, converged, iterations
+
+
+def _initial_beta(x, y, family, ncols):
+    """
+    Data-based IRLS start on the leading ncols columns: one weighted least-squares
+    step from mu = y + 0.1 (Poisson) or mu = (y + 0.5) / 2 (binomial). Unlike
+    seeding a single coefficient, this does not depend on where (or whether) the
+    design has an intercept column.
+    """
+    xtwx = [[0.0] * ncols for _ in range(ncols)]
+    xtwz = [0.0] * ncols
+    for row, yi in zip(x, y):
+        if family == 'binomial':
+            mu = (yi + 0.5) / 2.0
+            eta = math.log(mu / (1.0 - mu))
+            w = mu * (1.0 - mu)
+        else:
+            mu = yi + 0.1
+            eta = math.log(mu)
+            w = mu
+        z = eta + (yi - mu) / w
+        for a in range(ncols):
+            wa = w * row[a]
+            xtwz[a] += wa * z
+            target = xtwx[a]
+            for c in range(a + 1):
+                target[c] += wa * row[c]
+    for a in range(ncols):
+        for c in range(a):
+            xtwx[c][a] = xtwx[a][c]
+    return cho_solve(cholesky(xtwx), xtwz) + [0.0] * (len(x[0]) - ncols)
+
+
+def _compare_glm(y, x, q, family, max_iter, tol):
+    p = len(x[0])
+    beta = _initial_beta(x, y, family, q)
+    state = _glm_pass(x, y, beta, family, q)
+
+    # Restricted iterations only touch the q restricted columns; a single
+    # full-width pass at the restricted estimate then gives the score test and
+    # warm-starts the full fit.
+    beta_r, state_r, converged_r, iterations_r = _irls(x, y, family, q, beta, state, max_iter, tol)
+    state_r = _glm_pass(x, y, beta_r, family)
+    info_r, _, score_r, loglik_r = state_r
+    score = quadratic_form(cholesky(info_r), score_r)
+
+    beta_f, state_f, converged_f, iterations_f = _irls(x, y, family, p, beta_r, state_r, max_iter, tol)
+    info_f, _, _, loglik_f = state_f
+    cov = cho_inverse(cholesky(info_f))
+    extra_cov = [row[q:] for row in cov[q:]]
+    wald = quadratic_form(cholesky(extra_cov), beta_f[q:])
+
+    return _result(loglik_r, loglik_f, lrt=2.0 * (loglik_f - loglik_r), wald=wald, score=score, df=p - q,
+                   fits=((converged_r, iterations_r), (converged_f, iterations_f)))
+
+# --- PUBLIC API ---
+
+def compare_nested(y, restricted, full, family='binomial', max_iter=50, tol=1e-10):
+    """
+    Computes the likelihood ratio, Wald and score tests for one nested pair.
+    Args:
+        y (sequence): Response values (0/1 for 'binomial', counts for 'poisson').
+        restricted (sequence): Rows of the restricted design matrix.
+        full (sequence): Rows of the full design matrix; must contain every
+                         restricted column (in any position).
+        family (str): 'gaussian', 'binomial' (logit link) or 'poisson' (log link).
+        max_iter (int): Maximum IRLS iterations per fit.
+        tol (float): Relative convergence tolerance on the log-likelihood.
+    Returns:
+        dict: 'lrt', 'wald', 'score' with their '_p' p-values, 'df', the
+              maximized 'loglik_restricted' and 'loglik_full', and per fit
+              'converged_restricted' / 'converged_full' and 'iterations_restricted' /
+              'iterations_full' ('converged' is True only if both fits converged;
+              Gaussian fits are closed-form, so they always converge in 0 iterations).
+              A fit that reaches max_iter, e.g. under complete separation, is
+              reported with converged False and its statistics are unreliable.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown family '{family}'. Choose from: {', '.join(FAMILIES)}")
+    if not (len(y) == len(restricted) == len(full)):
+        raise ValueError("'y', 'restricted' and 'full' must have the same number of rows.")
+    x, q = _align_columns(restricted, full)
+    if family == 'gaussian':
+        return _compare_gaussian(y, x, q)
+    return _compare_glm(y, x, q, family, max_iter, tol)
+
+
+def _compare_job(job):
+    y, restricted, full, family = job
+    return compare_nested(y, restricted, full, family)
+
+
+def run_comparisons(pairs, family='binomial', processes=None, chunksize=8):
+    """
+    Runs compare_nested() on many independent pairs, over a process pool.
+    Args:
+        pairs (iterable): (y, restricted, full) tuples.
+        family (str): GLM family shared by every pair.
+        processes (int, optional): Worker processes; defaults to os.cpu_count().
+                                   Use 1 to run in the calling process.
+        chunksize (int): Pairs handed to a worker at a time.
+    Returns:
+        list: One compare_nested() result per pair, in input order.
+    """
+    jobs = ((y, restricted, full, family) for y, restricted, full in pairs)
+    if processes == 1:
+        return [_compare_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_compare_job, jobs, chunksize=chunksize))
+
+# --- BENCHMARK ---
+
+def _synthetic_pairs(n_pairs, n_obs, family, n_restricted=3, n_extra=2, seed=0):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n_pairs):
+        full = [[1.0] + [rng.gauss(0.0, 1.0) for _ in range(n_restricted + n_extra - 1)] for _ in range(n_obs)]
+        y = []
+        for row in full:
+            eta = 0.3 * row[1] - 0.2 * row[2] + 0.15 * row[-1]
+            if family == 'binomial':
+                y.append(1.0 if rng.random() < 1.0 / (1.0 + math.exp(-eta)) else 0.0)
+            elif family == 'poisson':
+                y.append(float(sum(1 for _ in range(20) if rng.random() < math.exp(eta) / 20.0)))
+            else:
+                y.append(eta + rng.gauss(0.0, 1.0))
+        pairs.append((y, [row[:n_restricted] for row in full], full))
+    return pairs
+
+
+def benchmark(n_pairs=200, n_obs=500, family='binomial', workers=None):
+    """Reports pair throughput for increasing process-pool sizes."""
+    pairs = _synthetic_pairs(n_pairs, n_obs, family)
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    print(f"{n_pairs} {family} pairs x {n_obs} rows")
+    print(f"{'workers':>8} {'seconds':>9} {'pairs/s':>9}")
+    results = []
+    for count in workers:
+        start = time.perf_counter()
+        run_comparisons(pairs, family, processes=count)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8} {elapsed:>9.3f} {n_pairs / elapsed:>9.1f}")
+        results.append({'workers': count, 'seconds': elapsed, 'pairs_per_second': n_pairs / elapsed})
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(family=sys.argv[1] if len(sys.argv) > 1 else 'binomial')
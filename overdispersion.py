@@ -0,0 +1,223 @@
+# overdispersion.py
+# Description: Streaming overdispersion diagnostics that answer the Section C
+# question "Do you suspect overdispersion?" from the data itself, choosing
+# between "31. Poisson Regression" and "32. Negative Binomial Regression".
+# Count data are consumed in chunks, so datasets larger than memory only ever
+# hold one chunk plus O(p^2) running sums.
+
+import csv
+import math
+from itertools import repeat
+
+from _numerics import chi2_sf, cholesky, cho_solve
+
+POISSON_KEY = "31. Poisson Regression (Likelihood Ratio Test, Wald Test, Score Test)"
+NEGATIVE_BINOMIAL_KEY = "32. Negative Binomial Regression (Likelihood Ratio Test, Wald Test, Score Test) (handles overdispersion)"
+
+
+class RunningMoments:
+    """Running count, mean and sum of squared deviations, merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Folds a chunk of values into the running sums."""
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = sum(values) / n_b
+        m2_b = sum((v - mean_b) ** 2 for v in values)
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+
+def read_csv_chunks(path, count_column, covariate_columns=(), chunk_size=100000):
+    """
+    Builds a re-readable chunk source from a CSV file with a header row.
+    Args:
+        path (str): CSV file path.
+        count_column (str): Name of the count (dependent variable) column.
+        covariate_columns (sequence): Names of covariate columns (may be empty).
+        chunk_size (int): Rows per chunk.
+    Returns:
+        callable: Each call yields (counts, covariate_rows) chunks from the start of the file.
+    """
+    def chunks():
+        with open(path, newline='') as handle:
+            counts, rows = [], []
+            for record in csv.DictReader(handle):
+                counts.append(float(record[count_column]))
+                rows.append([float(record[name]) for name in covariate_columns])
+                if len(counts) == chunk_size:
+                    yield counts, rows
+                    counts, rows = [], []
+            if counts:
+                yield counts, rows
+    return chunks
+
+
+def _irls_pass(chunks, beta, intercept):
+    """
+    One streamed pass at fixed beta: accumulates X'WX and X'Wz for the next IRLS
+    step together with the Poisson deviance and Pearson chi-squared at beta.
+    """
+    p = len(beta)
+    xtwx = [[0.0] * p for _ in range(p)]
+    xtwz = [0.0] * p
+    deviance = 0.0
+    pearson = 0.0
+    n = 0
+    for counts, rows in chunks():
+        for y, row in zip(counts, rows or repeat((), len(counts))):
+            x = [1.0] + list(row) if intercept else row
+            eta = sum(b * v for b, v in zip(beta, x))
+            mu = math.exp(eta)
+            z = eta + (y - mu) / mu
+            for a in range(p):
+                wa = mu * x[a]
+                xtwz[a] += wa * z
+                row_a = xtwx[a]
+                for c in range(a + 1):
+                    row_a[c] += wa * x[c]
+            deviance += 2.0 * ((y * math.log(y / mu) if y > 0 else 0.0) - (y - mu))
+            pearson += (y - mu) ** 2 / mu
+        n += len(counts)
+    for a in range(p):
+        for c in range(a):
+            xtwx[c][a] = xtwx[a][c]
+    return xtwx, xtwz, deviance, pearson, n
+
+
+def fit_poisson_streaming(chunks, intercept=True, max_iter=50, tol=1e-8):
+    """
+    Fits a Poisson log-linear model by IRLS, one pass over the chunks per iteration.
+    Args:
+        chunks (callable): Returns a fresh iterable of (counts, covariate_rows) chunks.
+                           Empty covariate_rows throughout give an intercept-only model.
+        intercept (bool): Prepend an intercept column to the covariates.
+        max_iter (int): Maximum IRLS iterations.
+        tol (float): Relative convergence tolerance on the deviance.
+    Returns:
+        dict: 'coef', 'deviance', 'pearson_chi2', 'n', 'df_resid', 'iterations',
+              and the marginal 'mean' and 'variance' of the counts. The deviance
+              and Pearson statistic are evaluated at 'coef', also when max_iter
+              is reached before convergence.
+    Raises:
+        ValueError: If there are no observations, all counts are zero, chunks
+                    disagree on the number of covariates, the model has no columns,
+                    or there are fewer observations than coefficients.
+    """
+    moments = RunningMoments()
+    width = None
+    for counts, rows in chunks():
+        if not counts:
+            continue
+        moments.update(counts)
+        chunk_width = len(rows[0]) if rows else 0
+        if width is None:
+            width = chunk_width
+        elif chunk_width != width:
+            raise ValueError(f"Chunks disagree on the number of covariates ({width} vs {chunk_width}).")
+    if not moments.n:
+        raise ValueError("No observations supplied.")
+    if moments.mean <= 0.0:
+        raise ValueError("All counts are zero; the Poisson model is degenerate.")
+    p = width + (1 if intercept else 0)
+    if p == 0:
+        raise ValueError("No covariates and no intercept: the model has no columns.")
+    if moments.n < p:
+        raise ValueError(f"{moments.n} observations cannot identify {p} coefficients.")
+
+    beta = [0.0] * p
+    if intercept:
+        beta[0] = math.log(moments.mean)
+    previous = None
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        xtwx, xtwz, deviance, pearson, n = _irls_pass(chunks, beta, intercept)
+        if iterations == max_iter or (previous is not None and abs(deviance - previous) <= tol * (abs(deviance) + 0.1)):
+            break  # Return the beta the deviance and Pearson statistic were evaluated at.
+        previous = deviance
+        beta = cho_solve(cholesky(xtwx), xtwz)
+    return {
+        'coef': beta,
+        'deviance': deviance,
+        'pearson_chi2': pearson,
+        'n': n,
+        'df_resid': n - p,
+        'iterations': iterations,
+        'mean': moments.mean,
+        'variance': moments.variance,
+    }
+
+
+def diagnose_overdispersion(chunks, covariates=True, alpha=0.05, min_dispersion=1.1):
+    """
+    Estimates the Pearson dispersion of count data and answers the Section C branch.
+    Args:
+        chunks (callable): Returns a fresh iterable of (counts, covariate_rows) chunks.
+                           Without covariates the rows are ignored and a single
+                           pass over the counts is enough.
+        covariates (bool): Fit the Poisson model on the covariates (IRLS) rather than
+                           comparing the marginal variance with the marginal mean.
+        alpha (float): Significance level of the one-sided Pearson chi-squared test.
+        min_dispersion (float): Smallest dispersion treated as practically relevant;
+                                with millions of rows even trivial excess variance is
+                                "significant".
+    Returns:
+        dict: 'dispersion', 'p_value', 'n', 'mean', 'variance', 'poisson_fit'
+              (None without covariates), 'overdispersed', 'answer' ('y' or 'n' as in handle_section_c) and 'tests'.
+    Raises:
+        ValueError: If there are no observations, all counts are zero, or no
+                    residual degrees of freedom are left (n <= number of parameters).
+    """
+    if covariates:
+        fit = fit_poisson_streaming(chunks)
+        n, mean, variance = fit['n'], fit['mean'], fit['variance']
+        pearson, df = fit['pearson_chi2'], fit['df_resid']
+    else:
+        moments = RunningMoments()
+        for counts, _ in chunks():
+            moments.update(counts)
+        if not moments.n:
+            raise ValueError("No observations supplied.")
+        if moments.mean <= 0.0:
+            raise ValueError("All counts are zero; dispersion is undefined.")
+        fit = None
+        n, mean, variance = moments.n, moments.mean, moments.variance
+        pearson, df = moments.m2 / moments.mean, moments.n - 1
+    if df <= 0:
+        raise ValueError(f"Dispersion needs more observations than fitted parameters (n = {n}, parameters = {n - df}).")
+    dispersion = pearson / df
+    p_value = chi2_sf(pearson, df)
+    overdispersed = p_value < alpha and dispersion >= min_dispersion
+    return {
+        'dispersion': dispersion,
+        'p_value': p_value,
+        'n': n,
+        'mean': mean,
+        'variance': variance,
+        'poisson_fit': fit,
+        'overdispersed': overdispersed,
+        'answer': 'y' if overdispersed else 'n',
+        'tests': [POISSON_KEY, NEGATIVE_BINOMIAL_KEY] if overdispersed else [POISSON_KEY],
+    }
+
+
+def print_count_model_recommendation(diagnosis):
+    """Prints the Section C count-model recommendation with the dispersion estimate."""
+    from statistical_tests_guide import print_recommendation
+    verdict = "overdispersion detected" if diagnosis['overdispersed'] else "no relevant overdispersion"
+    notes = (f"Pearson dispersion estimate = {diagnosis['dispersion']:.3f} "
+             f"(p = {diagnosis['p_value']:.3g}, n = {diagnosis['n']}): {verdict}.")
+    return print_recommendation(diagnosis['tests'], notes=notes)
@@ -0,0 +1,11 @@
+# recommend.py
+# Description: One-shot launcher for schedulers that spawn the guide once per
+# request, e.g. `python -S recommend.py a 1 3 r n`. Importing the guide (rather
+# than running statistical_tests_guide.py as a script) lets Python reuse its
+# cached bytecode instead of recompiling the whole file on every spawn.
+
+import sys
+
+from statistical_tests_guide import run_one_shot
+
+sys.exit(run_one_shot(sys.argv[1:]))
@@ -0,0 +1,289 @@
+# result_cache.py
+# Description: Content-addressed cache for data-driven assumption checks. Input
+# columns are fingerprinted with a chunked BLAKE2b hash; the checks behind the
+# "parametric assumptions met?" and "small expected counts?" branches, plus the
+# recommendation they lead to, are stored on disk under that fingerprint. Entries
+# are written atomically (temporary file + os.replace) so several processes can
+# share one cache directory, and the directory is kept under a byte budget by
+# evicting the least recently used entries.
+
+import hashlib
+import json
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+
+from _numerics import chi2_sf
+
+CHUNK_VALUES = 1 << 16
+CACHE_FORMAT = 1  # Bump when the stored results change shape.
+TEMPORARY_MAX_AGE = 3600.0  # Seconds before an orphaned temporary file (crashed writer) is removed.
+RESCAN_EVERY = 256  # Puts between directory rescans that pick up other processes' writes.
+
+# --- FINGERPRINTS ---
+
+def _pack_chunk(chunk):
+    """Type-tagged bytes for a chunk: doubles, 64-bit integers, or repr() text for anything else."""
+    if all(isinstance(v, float) for v in chunk):
+        return b'd' + array('d', chunk).tobytes()
+    if all(isinstance(v, int) for v in chunk):
+        try:
+            return b'q' + array('q', chunk).tobytes()  # Exact: doubles collide above 2**53.
+        except OverflowError:  # Beyond 64 bits.
+            pass
+    return b'r' + '\x1f'.join(map(repr, chunk)).encode('utf-8')  # Labels, mixed types, huge ints.
+
+
+def _hash_column(digest, column):
+    try:
+        view = memoryview(column)  # array('d'), bytes and other buffers hash directly.
+    except TypeError:
+        view = None
+    if view is not None:
+        digest.update(b'B' + view.format.encode() + struct.pack('<Q', view.nbytes))
+        digest.update(view.cast('B'))
+        return
+    digest.update(b'L' + struct.pack('<Q', len(column)))
+    for start in range(0, len(column), CHUNK_VALUES):
+        digest.update(_pack_chunk(column[start:start + CHUNK_VALUES]))
+
+
+def fingerprint(*columns, **params):
+    """
+    Hex digest identifying a set of input columns and the check parameters.
+    Float sequences are packed to doubles and integer sequences to 64-bit
+    integers, in chunks of CHUNK_VALUES values (anything else is hashed by repr);
+    anything exposing the buffer protocol (e.g. array('d')) is hashed in place.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps([CACHE_FORMAT, params], sort_keys=True, default=repr).encode('utf-8'))
+    for column in columns:
+        _hash_column(digest, column)
+    return digest.hexdigest()
+
+# --- ON-DISK LRU CACHE ---
+
+class ResultCache:
+    """A size-bounded, multi-process-safe JSON result cache in one directory."""
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._approx_bytes = sum(size for _, _, size in self._entries())
+        self._puts_since_scan = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self, temporary=False):
+        """(mtime, path, size) of the stored entries, or of the temporary files if temporary is True."""
+        suffix = '.tmp' if temporary else '.json'
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(suffix):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # Evicted or renamed by another process.
+                        continue
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def get(self, key):
+        """Returns the cached value for key, or None. A hit refreshes the entry's LRU position."""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                value = json.load(handle)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):  # Missing, evicted or half-written by a crash.
+            return None
+        return value
+
+    def put(self, key, value):
+        """
+        Stores value (JSON-serializable) under key, then evicts down to max_bytes if needed.
+        A running size estimate (the last directory scan plus this process's writes)
+        avoids scanning on every put. The directory is rescanned when the estimate
+        crosses max_bytes and at least every RESCAN_EVERY puts, so writes by other
+        processes sharing the directory are counted too.
+        """
+        data = json.dumps(value).encode('utf-8')
+        temporary = os.path.join(self.directory, f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, self._path(key))
+        with self._lock:
+            self._approx_bytes += len(data)
+            self._puts_since_scan += 1
+            if self._approx_bytes > self.max_bytes or self._puts_since_scan >= RESCAN_EVERY:
+                self._evict()
+
+    def _evict(self):
+        cutoff = time.time() - TEMPORARY_MAX_AGE
+        for modified, path, _ in self._entries(temporary=True):
+            if modified < cutoff:
+                self._remove(path)
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._approx_bytes = total
+        self._puts_since_scan = 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # Already removed by another process.
+            pass
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        for _, path, _ in self._entries():
+            self._remove(path)
+        self._approx_bytes = 0
+
+# --- ASSUMPTION CHECKS ---
+
+def _jarque_bera(values):
+    n = len(values)
+    mean = sum(values) / n
+    m2 = sum((v - mean) ** 2 for v in values) / n
+    if m2 == 0.0:
+        return float('nan'), float('nan')
+    m3 = sum((v - mean) ** 3 for v in values) / n
+    m4 = sum((v - mean) ** 4 for v in values) / n
+    skewness = m3 / m2 ** 1.5
+    kurtosis = m4 / (m2 * m2)
+    statistic = n / 6.0 * (skewness ** 2 + (kurtosis - 3.0) ** 2 / 4.0)
+    return statistic, chi2_sf(statistic, 2)
+
+
+def check_parametric(values, groups=None, alpha=0.05):
+    """
+    Answers "Are parametric assumptions met?" for one sample or several groups.
+    Normality is checked per group with the Jarque-Bera test and, for two or more
+    groups, homogeneity of variances with the Brown-Forsythe test.
+    Returns:
+        dict: 'normality' ({group: p_value}), 'equal_variances_p' (None for one
+              group) and 'answer' ('y' or 'n').
+    """
+    from variance_tests import batch_variance_tests
+    if groups is None:
+        groups = [0] * len(values)
+    grouped = {}
+    for value, group in zip(values, groups):
+        grouped.setdefault(group, []).append(value)
+    normality = {repr(group): _jarque_bera(group_values)[1] for group, group_values in grouped.items()}
+    equal_variances_p = None
+    if len(grouped) > 1:
+        equal_variances_p = batch_variance_tests([(v,) for v in values], groups)['brown_forsythe'][0][1]
+    met = all(p > alpha for p in normality.values()) and (equal_variances_p is None or equal_variances_p > alpha)
+    return {
+        'normality': normality,
+        'equal_variances_p': equal_variances_p,
+        'answer': 'y' if met else 'n',
+    }
+
+
+def check_expected_counts(rows, columns, minimum=5.0):
+    """
+    Answers "Are expected cell counts small?" for two categorical columns.
+    Returns:
+        dict: 'min_expected', 'share_below_minimum' and 'answer' ('y' if any
+              expected count is below minimum, else 'n').
+    """
+    n = len(rows)
+    row_totals, column_totals = {}, {}
+    for r, c in zip(rows, columns):
+        row_totals[r] = row_totals.get(r, 0) + 1
+        column_totals[c] = column_totals.get(c, 0) + 1
+    expected = [rt * ct / n for rt in row_totals.values() for ct in column_totals.values()]
+    below = sum(1 for e in expected if e < minimum)
+    return {
+        'min_expected': min(expected) if expected else math.nan,
+        'share_below_minimum': below / len(expected) if expected else math.nan,
+        'answer': 'y' if below else 'n',
+    }
+
+
+_tree_hashes = {}
+
+
+def _decision_tree(knowledge_base=None):
+    """(index, tree hash) of a loaded KnowledgeBase, or of the installed guide."""
+    if knowledge_base is not None:
+        return knowledge_base.index, knowledge_base.tree_hash
+    from decision_index import get_index
+    from knowledge_base import content_hash
+    index = get_index()
+    if id(index) not in _tree_hashes:
+        _tree_hashes[id(index)] = content_hash(index.tree)
+    return index, _tree_hashes[id(index)]
+
+
+def _check_path(index, answers, what):
+    if tuple(answers) not in index.nodes:
+        raise ValueError(f"Invalid {what} {list(answers)!r}: not a path in the decision tree.")
+
+
+def _recommend(index, answers):
+    """Tests for a complete answer path, or those still reachable for a partial one."""
+    _check_path(index, answers, "answer path")
+    tests = index.recommendation(answers)
+    return list(tests if tests is not None else index.remaining_tests(answers))
+
+
+def _cached_check(cache, check, columns, params, answers_before, answers_after, knowledge_base):
+    index = tree_hash = None
+    if answers_before is not None:
+        # The recommendation depends on the decision tree, so its version is part of the key.
+        index, tree_hash = _decision_tree(knowledge_base)
+        _check_path(index, answers_before, "answers_before")
+        if index.next_question(answers_before) is None:
+            raise ValueError(f"Invalid answers_before {list(answers_before)!r}: the path is already complete.")
+    key = fingerprint(*columns, **params, before=answers_before, after=list(answers_after), tree=tree_hash)
+
+    def compute():
+        result = check()
+        if index is not None:
+            result['recommendation'] = _recommend(index, list(answers_before) + [result['answer']] + list(answers_after))
+        return result
+    return cache.get_or_compute(key, compute)
+
+
+def cached_parametric_check(cache, values, groups=None, alpha=0.05, answers_before=None, answers_after=(),
+                            knowledge_base=None):
+    """
+    check_parametric() through the cache. If answers_before is given (the answer
+    path up to the parametric question), the resulting recommendation for
+    answers_before + [answer] + answers_after is computed and cached too, keyed
+    by the version of the decision tree: the installed guide's, or that of
+    knowledge_base (a knowledge_base.KnowledgeBase) if given.
+    """
+    return _cached_check(cache, lambda: check_parametric(values, groups, alpha), (values, groups or ()),
+                         {'check': 'parametric', 'alpha': alpha}, answers_before, answers_after, knowledge_base)
+
+
+def cached_expected_counts_check(cache, rows, columns, minimum=5.0, answers_before=None, answers_after=(),
+                                 knowledge_base=None):
+    """check_expected_counts() through the cache; see cached_parametric_check() for the answer paths."""
+    return _cached_check(cache, lambda: check_expected_counts(rows, columns, minimum), (rows, columns),
+                         {'check': 'expected_counts', 'minimum': minimum}, answers_before, answers_after,
+                         knowledge_base)
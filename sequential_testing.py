@@ -0,0 +1,180 @@
+# sequential_testing.py
+# Description: Online mode for the categorical Section A branches used in live
+# A/B experiments ("23. Z-test for Proportions (Two-sample)", "18. Chi-squared
+# (χ²) Test of Independence/Association" on the 2x2 table and "19. Fisher's
+# Exact Test"). Each experiment keeps O(1) sufficient statistics (trials and
+# successes per arm) in flat arrays, every event is folded in in constant time,
+# and an always-valid p-value (mixture sequential probability ratio test) can be
+# polled at any moment without inflating the Type I error.
+
+import math
+from array import array
+
+from _numerics import chi2_sf, normal_sf
+
+Z_TEST_KEY = "23. Z-test for Proportions (Two-sample) (Large N, often equivalent to Chi-squared for 2x2)"
+CHI_SQUARED_KEY = "18. Chi-squared (χ²) Test of Independence/Association"
+FISHER_KEY = "19. Fisher's Exact Test"
+
+ARMS = 2  # Control (0) and treatment (1).
+
+
+class SequentialExperiments:
+    """
+    Array-backed state for many concurrent two-arm experiments with binary outcomes.
+    Memory per experiment is four 64-bit counters and one double.
+    """
+
+    def __init__(self, tau=0.05, burn_in=100):
+        """
+        Args:
+            tau (float): Standard deviation of the normal mixing distribution over
+                         the difference in proportions (the effect sizes the test is
+                         tuned to detect).
+            burn_in (int): Trials required in each arm before the always-valid
+                           p-value starts updating (the plug-in variance is unstable
+                           on the first few events).
+        """
+        self.tau2 = tau * tau
+        self.burn_in = burn_in
+        self.trials = array('q')
+        self.successes = array('q')
+        self.p_values = array('d')
+
+    def __len__(self):
+        return len(self.p_values)
+
+    def _check(self, experiment, arm=0):
+        """Rejects ids outside the flat arrays, which would otherwise alias another experiment."""
+        if not 0 <= experiment < len(self.p_values):
+            raise ValueError(f"Unknown experiment id {experiment!r}; {len(self.p_values)} experiments are registered.")
+        if arm not in (0, 1):
+            raise ValueError(f"Invalid arm {arm!r}; use 0 for control or 1 for treatment.")
+
+    def new_experiment(self):
+        """Registers an experiment and returns its integer id."""
+        self.trials.extend((0, 0))
+        self.successes.extend((0, 0))
+        self.p_values.append(1.0)
+        return len(self.p_values) - 1
+
+    def new_experiments(self, count):
+        """Registers count experiments at once and returns the range of their ids."""
+        start = len(self.p_values)
+        self.trials.extend(array('q', [0]) * (ARMS * count))
+        self.successes.extend(array('q', [0]) * (ARMS * count))
+        self.p_values.extend(array('d', [1.0]) * count)
+        return range(start, start + count)
+
+    def record(self, experiment, arm, success):
+        """
+        Folds one event into an experiment in constant time.
+        Args:
+            experiment (int): Id from new_experiment().
+            arm (int): 0 for control, 1 for treatment.
+            success (bool): Whether the event was a success (e.g. a conversion).
+        Returns:
+            float: The updated always-valid p-value of the experiment.
+        Raises:
+            ValueError: If the experiment id or arm is out of range.
+        """
+        self._check(experiment, arm)
+        slot = ARMS * experiment + arm
+        self.trials[slot] += 1
+        if success:
+            self.successes[slot] += 1
+        return self._update_p_value(experiment)
+
+    def record_batch(self, events):
+        """Folds an iterable of (experiment, arm, success) events."""
+        for experiment, arm, success in events:
+            self.record(experiment, arm, success)
+
+    def _difference(self, experiment):
+        """Returns (n0, n1, x0, x1, difference, unpooled variance of the difference)."""
+        base = ARMS * experiment
+        n0, n1 = self.trials[base], self.trials[base + 1]
+        x0, x1 = self.successes[base], self.successes[base + 1]
+        p0 = x0 / n0 if n0 else 0.0
+        p1 = x1 / n1 if n1 else 0.0
+        variance = (p0 * (1.0 - p0) / n0 if n0 else 0.0) + (p1 * (1.0 - p1) / n1 if n1 else 0.0)
+        return n0, n1, x0, x1, p1 - p0, variance
+
+    def _update_p_value(self, experiment):
+        n0, n1, _, _, diff, variance = self._difference(experiment)
+        current = self.p_values[experiment]
+        if n0 < self.burn_in or n1 < self.burn_in or variance <= 0.0:
+            return current
+        # Normal-mixture likelihood ratio against H0: difference = 0.
+        total = variance + self.tau2
+        log_ratio = 0.5 * math.log(variance / total) + diff * diff * self.tau2 / (2.0 * variance * total)
+        if log_ratio > 0.0:
+            candidate = math.exp(-log_ratio)
+            if candidate < current:
+                current = candidate
+                self.p_values[experiment] = current
+        return current
+
+    def always_valid_p_value(self, experiment):
+        """The running always-valid p-value; safe to poll after every event."""
+        self._check(experiment)
+        return self.p_values[experiment]
+
+    def statistics(self, experiment):
+        """
+        Current counts and fixed-horizon statistics for one experiment.
+        Returns:
+            dict: Per-arm 'trials' and 'successes', the pooled two-proportion 'z'
+                  and its p-value, the equivalent 2x2 'chi2' and p-value, the
+                  'always_valid_p' value, and 'recommended' (the Section A test(s)
+                  appropriate for the current expected cell counts).
+                  Only 'always_valid_p' may be monitored continuously.
+        """
+        self._check(experiment)
+        n0, n1, x0, x1, diff, _ = self._difference(experiment)
+        n = n0 + n1
+        pooled = (x0 + x1) / n if n else 0.0
+        se = math.sqrt(pooled * (1.0 - pooled) * (1.0 / n0 + 1.0 / n1)) if n0 and n1 else 0.0
+        z = diff / se if se else 0.0
+        chi2 = z * z  # The 2x2 chi-squared statistic without continuity correction.
+        smallest_expected = min(n0, n1) * min(pooled, 1.0 - pooled)
+        return {
+            'trials': (n0, n1),
+            'successes': (x0, x1),
+            'difference': diff,
+            'z': z,
+            'z_p': 2.0 * normal_sf(abs(z)) if se else 1.0,
+            'chi2': chi2,
+            'chi2_p': chi2_sf(chi2, 1) if se else 1.0,
+            'always_valid_p': self.p_values[experiment],
+            'recommended': [FISHER_KEY] if smallest_expected < 5 else [Z_TEST_KEY, CHI_SQUARED_KEY],
+        }
+
+    def fisher_exact(self, experiment):
+        """
+        Two-sided Fisher's exact p-value for the experiment's current 2x2 table.
+        This is a fixed-horizon test costing O(min(margins)); compute it once at
+        the end of a small experiment rather than after every event.
+        """
+        self._check(experiment)
+        n0, n1, x0, x1, _, _ = self._difference(experiment)
+        return fisher_exact_2x2(x0, n0 - x0, x1, n1 - x1)
+
+
+def fisher_exact_2x2(a, b, c, d):
+    """Two-sided Fisher's exact test p-value for the table [[a, b], [c, d]]."""
+    row0, row1, col0 = a + b, c + d, a + c
+    n = row0 + row1
+
+    def log_probability(k):
+        return (math.lgamma(row0 + 1) - math.lgamma(k + 1) - math.lgamma(row0 - k + 1)
+                + math.lgamma(row1 + 1) - math.lgamma(col0 - k + 1) - math.lgamma(row1 - col0 + k + 1)
+                - math.lgamma(n + 1) + math.lgamma(col0 + 1) + math.lgamma(n - col0 + 1))
+
+    observed = log_probability(a)
+    total = 0.0
+    for k in range(max(0, col0 - row1), min(row0, col0) + 1):
+        log_p = log_probability(k)
+        if log_p <= observed + 1e-7:
+            total += math.exp(log_p)
+    return min(1.0, total)
@@ -5,6 +5,7 @@
 # (This program was developed with the assistance of Google's Gemini 2.5 Pro model.)
 
 import sys
+import types
 
 # --- TEST SUMMARIES DICTIONARY (ASSUMING KEYS ARE CLEAN, e.g., "37. Brown-Forsythe Test") ---
 TEST_SUMMARIES = {
@@ -461,6 +462,9 @@ TEST_SUMMARIES = {
     }
 }
 
+class IncompleteAnswers(ValueError):
+    """Raised in one-shot mode when the supplied answers run out or are invalid."""
+
 def ask_question(prompt, options):
     """
     Helper function to ask a question and get a validated choice.
@@ -485,36 +489,79 @@ def ask_question(prompt, options):
         else:
             print(f"Invalid input. Please choose from: {', '.join(options.keys())}")
 
-def print_recommendation(tests, notes=None):
-    """Prints the recommended test(s) and their summaries."""
+def format_test_summary(test_name, summary):
+    """
+    Formats one recommended test and its summary (purpose and key assumptions).
+    Args:
+        test_name (str): The TEST_SUMMARIES key.
+        summary (dict or None): Its TEST_SUMMARIES entry, if any.
+    Returns:
+        str: The block shown for this test by print_recommendation.
+    """
+    lines = [f"\n  >>> {test_name} <<<"]
+    if summary:
+        lines.append(f"    Purpose: {summary.get('purpose', 'N/A')}")
+        if 'assumptions' in summary and summary['assumptions']:
+            lines.append("    Key Assumptions:")
+            for assumption in summary['assumptions']:
+                lines.append(f"      - {assumption}")
+        else:
+            lines.append("    (Key assumptions not detailed for this entry yet).")
+    else:
+        lines.append(f"    (Summary for '{test_name}' is not yet available in the guide.)") # More specific error
+    return "\n".join(lines)
+
+def format_recommendation(tests, notes=None, summaries=None, rendered=None):
+    """
+    Builds the recommendation text printed by print_recommendation.
+    Args:
+        tests (str or list): Recommended TEST_SUMMARIES key(s).
+        notes (str, optional): Additional notes for this path.
+        summaries (dict, optional): Summaries to use instead of TEST_SUMMARIES.
+        rendered (dict, optional): Pre-formatted format_test_summary() blocks by test name.
+    Returns:
+        str: The full recommendation block.
+    """
     if isinstance(tests, str):
         tests = [tests]
-    print("\n--- Recommendation ---")
+    if summaries is None:
+        summaries = TEST_SUMMARIES
+    lines = ["\n--- Recommendation ---"]
     if tests:
-        print("Based on your answers, suitable test(s) might be:")
+        lines.append("Based on your answers, suitable test(s) might be:")
         for test_name in tests:
-            print(f"\n  >>> {test_name} <<<")
-            summary = TEST_SUMMARIES.get(test_name)
-            if summary:
-                print(f"    Purpose: {summary.get('purpose', 'N/A')}")
-                if 'assumptions' in summary and summary['assumptions']:
-                    print("    Key Assumptions:")
-                    for assumption in summary['assumptions']:
-                        print(f"      - {assumption}")
-                else:
-                    print("    (Key assumptions not detailed for this entry yet).")
+            if rendered and test_name in rendered:
+                lines.append(rendered[test_name])
             else:
-                print(f"    (Summary for '{test_name}' is not yet available in the guide.)") # More specific error
+                lines.append(format_test_summary(test_name, summaries.get(test_name)))
 
         if any("ANOVA" in test or "Kruskal-Wallis" in test for test in tests if isinstance(test, str)):
-             print("\n  NOTE: If this test is significant for 3+ groups, follow up with appropriate post-hoc tests (e.g., Tukey's HSD, Dunn's test) to identify which specific groups differ.")
+             lines.append("\n  NOTE: If this test is significant for 3+ groups, follow up with appropriate post-hoc tests (e.g., Tukey's HSD, Dunn's test) to identify which specific groups differ.")
     else:
-        print("Could not determine a specific test with the provided path. Please review your choices or consult a statistician.")
+        lines.append("Could not determine a specific test with the provided path. Please review your choices or consult a statistician.")
     if notes:
-        print(f"\nAdditional Notes from guide: {notes}")
-    print("----------------------")
+        lines.append(f"\nAdditional Notes from guide: {notes}")
+    lines.append("----------------------")
+    return "\n".join(lines)
+
+def print_recommendation(tests, notes=None):
+    """Prints the recommended test(s) and their summaries."""
+    print(format_recommendation(tests, notes))
     return True
 
+# --- Main question: each option key selects handle_section_<key> ---
+MAIN_QUESTION = "1. What is your primary research goal?"
+MAIN_OPTIONS = {
+    'a': "Comparing groups (means, medians, proportions)",
+    'b': "Examining relationships or associations between variables",
+    'c': "Predicting an outcome based on predictor variables (Regression)",
+    'd': "Assessing distributional fit or checking model assumptions",
+    'e': "Analyzing time-ordered data (Time Series Analysis)",
+    'f': "Analyzing time-to-event data (Survival Analysis)",
+    'g': "Comparing variances/dispersion between groups",
+    'h': "General model comparison or parameter testing"
+}
+
 # --- Section Handlers (with corrected print_recommendation calls) ---
 
 def handle_section_a():
@@ -900,18 +947,7 @@ def guide_to_statistical_test():
     print("-" * 80)
 
 
-    q_main = "1. What is your primary research goal?"
-    opts_main = {
-        'a': "Comparing groups (means, medians, proportions)",
-        'b': "Examining relationships or associations between variables",
-        'c': "Predicting an outcome based on predictor variables (Regression)",
-        'd': "Assessing distributional fit or checking model assumptions",
-        'e': "Analyzing time-ordered data (Time Series Analysis)",
-        'f': "Analyzing time-to-event data (Survival Analysis)",
-        'g': "Comparing variances/dispersion between groups",
-        'h': "General model comparison or parameter testing"
-    }
-    main_choice = ask_question(q_main, opts_main)
+    main_choice = ask_question(MAIN_QUESTION, MAIN_OPTIONS)
 
     recommendation_made = False
 
@@ -939,5 +975,63 @@ def guide_to_statistical_test():
     print("\nEnd of consultation. Remember to verify test assumptions and consider effect sizes!")
     input("\nPress Enter to close this window...") 
 
+def run_one_shot(answers):
+    """
+    Non-interactive mode: answers every question from a list and prints only the
+    recommendation (no banner, no prompts). Only the chosen section handler runs
+    and only the recommended TEST_SUMMARIES entries are rendered.
+    Args:
+        answers (list): Option keys in question order, e.g. ['a', '1', '3', 'r', 'n'];
+                        comma-separated items are split ('a,1,3,r,n').
+    Returns:
+        int: Process exit status (0 on success, 1 if the path gives no recommendation,
+             2 for missing, invalid or extra answers). Nothing is printed to stdout
+             unless a recommendation is made.
+    """
+    pending = iter([part for answer in answers for part in answer.split(',') if part])
+    output = [] # Held back until the whole path is checked
+
+    def scripted_question(prompt, options):
+        choice = next(pending, None)
+        if choice is None:
+            raise IncompleteAnswers(f"More answers needed for: {prompt} (choose from: {', '.join(options.keys())})")
+        choice = choice.strip().lower()
+        if choice not in options:
+            raise IncompleteAnswers(f"Invalid answer '{choice}' for: {prompt} (choose from: {', '.join(options.keys())})")
+        return choice
+
+    def buffered_recommendation(tests, notes=None):
+        output.append(format_recommendation(tests, notes))
+        return True
+
+    try:
+        section = scripted_question(MAIN_QUESTION, MAIN_OPTIONS)
+        handler = globals()[f"handle_section_{section}"]
+        handler = getattr(handler, '__wrapped__', handler) # Skip instrumentation wrappers
+        # The handler's code runs on a private copy of the module globals, so sessions
+        # in other threads keep the interactive ask_question and print_recommendation.
+        scripted_globals = dict(globals(), ask_question=scripted_question, print_recommendation=buffered_recommendation)
+        recommendation_made = types.FunctionType(handler.__code__, scripted_globals, handler.__name__,
+                                                 handler.__defaults__, handler.__closure__)()
+        extra = list(pending)
+        if extra:
+            raise IncompleteAnswers(f"Unexpected extra answers after the recommendation: {' '.join(extra)}")
+    except IncompleteAnswers as error:
+        print(error, file=sys.stderr)
+        return 2
+    if not recommendation_made:
+        print("No specific test identified for this path yet, or the path is incomplete in this guide.", file=sys.stderr)
+        return 1
+    for text in output:
+        print(text)
+    return 0
+
 if __name__ == "__main__":
+    import os
+    if len(sys.argv) > 1:
+        sys.exit(run_one_shot(sys.argv[1:]))
+    if any(os.environ.get(name) for name in ("STAT_GUIDE_METRICS_FILE", "STAT_GUIDE_METRICS_PORT", "STAT_GUIDE_PROFILE")):
+        # Opt-in metrics/profiling; the instrumentation module is never imported otherwise.
+        from instrumentation import enable_from_environment
+        enable_from_environment(sys.modules[__name__])
     guide_to_statistical_test()
@@ -0,0 +1,99 @@
+# test_batch_runner.py
+# Description: Tests for the sharded, resumable batch runner.
+# Run with: python -m pytest -q
+
+import os
+import random
+
+import pytest
+
+from batch_runner import _claim, plan_shards, prepare_work_dir, process_shard, run_batch
+from decision_index import get_index
+
+
+@pytest.fixture
+def archive(tmp_path):
+    rng = random.Random(7)
+    paths = [','.join(answers) for answers in get_index().leaves]
+    lines = [rng.choice(paths) for _ in range(3000)]
+    lines[::97] = ['a 1 3 R n'] * len(lines[::97])  # Space-separated, mixed case.
+    lines[::101] = ['a,1'] * len(lines[::101])  # Incomplete.
+    lines[::103] = ['a,9'] * len(lines[::103])  # Invalid.
+    lines[::107] = [''] * len(lines[::107])  # Blank lines are skipped.
+    path = tmp_path / 'answers.txt'
+    path.write_text('\n'.join(lines) + '\n')
+    return path, lines
+
+
+def _expected(lines):
+    index = get_index()
+    expected = {'sequences': 0, 'recommended': 0, 'incomplete': 0, 'invalid': 0, 'tests': {}}
+    for line in lines:
+        answers = tuple(line.replace(',', ' ').lower().split())
+        if not answers:
+            continue
+        expected['sequences'] += 1
+        if answers in index.leaves:
+            expected['recommended'] += 1
+            for test in index.leaves[answers]:
+                expected['tests'][test] = expected['tests'].get(test, 0) + 1
+        else:
+            expected['incomplete' if answers in index.nodes else 'invalid'] += 1
+    return expected
+
+
+def _counts(results):
+    return {key: results[key] for key in ('sequences', 'recommended', 'incomplete', 'invalid', 'tests')}
+
+
+def test_shards_cover_the_file_on_line_boundaries(archive):
+    path, _ = archive
+    data = path.read_bytes()
+    shards = plan_shards(str(path), 1000)
+    assert len(shards) > 10
+    assert shards[0][0] == 0 and shards[-1][1] == len(data)
+    for (_, end), (start, _) in zip(shards, shards[1:]):
+        assert end == start
+        assert data[end - 1:end] == b'\n'
+
+
+def test_counts_match_direct_lookups(archive, tmp_path):
+    path, lines = archive
+    results = run_batch(str(path), str(tmp_path / 'work'), workers=3, shard_bytes=2000, checkpoint_lines=50)
+    assert _counts(results) == _expected(lines)
+    assert results['shards'] == len(plan_shards(str(path), 2000))
+    assert not os.listdir(tmp_path / 'work' / 'queue') and not os.listdir(tmp_path / 'work' / 'claimed')
+
+
+def test_crashed_run_resumes_from_checkpoints(archive, tmp_path):
+    path, lines = archive
+    work_dir = str(tmp_path / 'work')
+    manifest = prepare_work_dir(str(path), work_dir, 2000)
+    # Simulate a worker that died mid-shard: the shard stays in claimed/ with a checkpoint
+    # covering only its first lines.
+    name = _claim(work_dir)
+    start, end = manifest['shards'][int(name)]
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        for _ in range(10):
+            handle.readline()
+        middle = handle.tell()
+    partial = process_shard(str(path), work_dir, name, start, middle, get_index())
+    assert 0 < partial['sequences'] <= 10
+    assert os.listdir(os.path.join(work_dir, 'claimed')) == [name]
+
+    resumed = run_batch(str(path), work_dir, workers=2, shard_bytes=2000)
+    assert _counts(resumed) == _expected(lines)  # The first lines were neither lost nor counted twice.
+    assert not os.listdir(os.path.join(work_dir, 'claimed'))
+    clean = run_batch(str(path), str(tmp_path / 'clean'), workers=2, shard_bytes=2000)
+    assert _counts(resumed) == _counts(clean)
+
+
+def test_work_dir_of_another_input_is_rejected(archive, tmp_path):
+    path, _ = archive
+    work_dir = str(tmp_path / 'work')
+    prepare_work_dir(str(path), work_dir, 2000)
+    other = tmp_path / 'other.txt'
+    other.write_text('a,1,3,r,n\n')
+    with pytest.raises(ValueError, match="different or modified input"):
+        prepare_work_dir(str(other), work_dir, 2000)
@@ -0,0 +1,59 @@
+# test_decision_index.py
+# Description: Tests for the precomputed decision-tree index.
+# Run with: python -m pytest -q
+
+import pytest
+
+import statistical_tests_guide as guide
+from decision_index import build_decision_tree, get_index, replay
+
+
+def test_index_covers_every_path():
+    index = get_index()
+    assert len(index.leaves) == 53
+    assert index.recommendation(('a', '1', '3', 'r', 'n')) == ("13. Friedman Test (NP)",)
+    assert index.recommendation(('a', '1')) is None
+    assert index.next_question(('a', '1'))[0].startswith("A1.1.1.")
+    assert index.next_question(('a', '1', '3', 'r', 'n')) is None
+
+
+def test_remaining_tests_shrink_along_a_path():
+    index = get_index()
+    path = ('a', '1', '3', 'r', 'n')
+    everything = set(index.remaining_tests(()))
+    assert everything == {name for tests in index.leaves.values() for name in tests}
+    previous = everything
+    for depth in range(1, len(path) + 1):
+        current = set(index.remaining_tests(path[:depth]))
+        assert current <= previous
+        previous = current
+    assert previous == {"13. Friedman Test (NP)"}
+    # The bitset for a node is the union of its leaves.
+    reachable = {name for answers, tests in index.leaves.items() if answers[:2] == ('a', '1') for name in tests}
+    assert set(index.remaining_tests(('a', '1'))) == reachable
+
+
+def test_paths_to_matches_whole_tests_only():
+    index = get_index()
+    one_sample = index.paths_to("1. One-Sample t-test (P)")
+    assert index.paths_to("1") == one_sample
+    assert index.paths_to("1.") == one_sample
+    assert index.paths_to("1. one-sample t-test") == one_sample
+    assert all(index.recommendation(path) and "1. One-Sample t-test (P)" in index.recommendation(path)
+               for path in one_sample)
+    assert index.paths_to("13. Friedman Test") == (('a', '1', '3', 'r', 'n'),)
+    assert index.paths_to("Not a test") == ()
+    with pytest.raises(ValueError, match="several tests"):
+        index.paths_to("23")
+
+
+def test_replay_leaves_the_guide_module_untouched():
+    original = guide.ask_question, guide.print_recommendation
+    assert replay(['f'], guide)[0] == 'question'
+    kind, tests, _ = replay(['a', '1', '3', 'r', 'n'], guide)
+    assert (kind, tests) == ('recommendation', ["13. Friedman Test (NP)"])
+    with pytest.raises(ValueError, match="Invalid answer"):
+        replay(['a', '9'], guide)
+    assert build_decision_tree(guide, ('a', '1', '3', 'r'))['children']['n'] == {
+        'tests': ["13. Friedman Test (NP)"], 'notes': []}
+    assert (guide.ask_question, guide.print_recommendation) == original
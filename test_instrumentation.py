@@ -0,0 +1,63 @@
+# test_instrumentation.py
+# Description: Tests for the opt-in guide metrics and their Prometheus export.
+# Run with: python -m pytest -q
+
+import threading
+
+import pytest
+
+import instrumentation
+import statistical_tests_guide as guide
+
+
+@pytest.fixture
+def registry():
+    registry = instrumentation.MetricsRegistry()
+    instrumentation.enable(guide, registry)
+    try:
+        yield registry
+    finally:
+        instrumentation.disable(guide)
+
+
+def _run_session(monkeypatch, answers):
+    replies = iter(list(answers) + [''])  # The trailing '' closes the "Press Enter" prompt.
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(replies))
+    guide.guide_to_statistical_test()
+
+
+def test_session_metrics_are_exported(registry, monkeypatch, capsys):
+    _run_session(monkeypatch, ['a', '1', '3', 'r', 'n'])
+    recommended = capsys.readouterr().out.split('>>> ')[1].split(' <<<')[0]
+    text = instrumentation.render_prometheus(registry)
+    assert 'statguide_sessions_total 1\n' in text
+    assert 'statguide_section_total{section="a"} 1\n' in text
+    assert f'statguide_recommendations_total{{test="{recommended}"}} 1\n' in text
+    assert 'statguide_time_to_recommendation_seconds_count 1\n' in text
+    assert text.count('statguide_question_seconds_count{') == 5
+
+
+def test_disable_restores_original_functions():
+    original = guide.ask_question
+    instrumentation.enable(guide, instrumentation.MetricsRegistry())
+    assert guide.ask_question is not original
+    assert guide.ask_question.__wrapped__ is original
+    instrumentation.disable(guide)
+    assert guide.ask_question is original
+
+
+def test_thread_shards_are_merged(tmp_path):
+    registry = instrumentation.MetricsRegistry()
+
+    def work():
+        for _ in range(1000):
+            registry.inc('statguide_section_total', ('b',))
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    path = tmp_path / 'metrics.prom'
+    instrumentation.write_prometheus(str(path), registry)
+    assert 'statguide_section_total{section="b"} 4000\n' in path.read_text()
+    assert [p.name for p in tmp_path.iterdir()] == ['metrics.prom']
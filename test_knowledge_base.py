@@ -0,0 +1,90 @@
+# test_knowledge_base.py
+# Description: Tests for the hot-reloadable knowledge base and its pinned sessions.
+# Run with: python -m pytest -q
+
+import json
+
+import pytest
+
+import statistical_tests_guide as guide
+from knowledge_base import (KnowledgeBase, KnowledgeBaseStore, check_document, export_knowledge_base,
+                            load_knowledge_base)
+
+FRIEDMAN = "13. Friedman Test (NP)"
+FRIEDMAN_PATH = ('a', '1', '3', 'r', 'n')
+
+
+@pytest.fixture
+def kb_path(tmp_path):
+    path = tmp_path / 'kb.json'
+    export_knowledge_base(str(path), '1')
+    return path
+
+
+def _rewrite(path, edit):
+    document = json.loads(path.read_text(encoding='utf-8'))
+    edit(document)
+    path.write_text(json.dumps(document, ensure_ascii=False), encoding='utf-8')
+
+
+def _walk(session, answers):
+    for choice in answers:
+        session.answer(choice)
+
+
+def test_exported_file_round_trips(kb_path):
+    knowledge_base = load_knowledge_base(str(kb_path))
+    assert knowledge_base.version == '1'
+    assert knowledge_base.tests == guide.TEST_SUMMARIES
+    assert knowledge_base.index.recommendation(FRIEDMAN_PATH) == (FRIEDMAN,)
+    assert knowledge_base.rendered[FRIEDMAN] == guide.format_test_summary(FRIEDMAN, guide.TEST_SUMMARIES[FRIEDMAN])
+    assert not list(kb_path.parent.glob('*.tmp'))
+
+
+def test_malformed_documents_are_rejected(kb_path):
+    document = json.loads(kb_path.read_text(encoding='utf-8'))
+    check_document(document)
+    document['tree']['children']['a']['children']['1']['options']['9'] = "Dangling option"
+    with pytest.raises(ValueError, match="options without children"):
+        KnowledgeBase(document)
+    with pytest.raises(ValueError, match="format"):
+        check_document(dict(document, format=99))
+
+
+def test_reload_swaps_versions_and_pinned_sessions_keep_theirs(kb_path):
+    store = KnowledgeBaseStore(str(kb_path), poll_interval=0.0)
+    old = store.current
+    pinned = store.new_session()
+    _walk(pinned, FRIEDMAN_PATH[:3])
+
+    def edit(document):
+        document['version'] = '2'
+        document['tests'][FRIEDMAN]['purpose'] = "Edited purpose."
+    _rewrite(kb_path, edit)
+    assert store.reload()
+    assert store.current.version == '2' and store.last_error is None
+    assert store.current.changed_entries == [FRIEDMAN]
+    assert store.current.index is old.index  # Tree unchanged: reindexing skipped.
+    assert store.current.rendered["1. One-Sample t-test (P)"] is old.rendered["1. One-Sample t-test (P)"]
+
+    _walk(pinned, FRIEDMAN_PATH[3:])
+    assert pinned.version == '1'
+    assert "Edited purpose." not in pinned.render()
+    fresh = store.new_session()
+    _walk(fresh, FRIEDMAN_PATH)
+    assert fresh.version == '2'
+    assert "Edited purpose." in fresh.render()
+    assert not store.reload()  # Unchanged file.
+
+
+def test_malformed_file_keeps_the_current_version(kb_path):
+    store = KnowledgeBaseStore(str(kb_path), poll_interval=0.0)
+    current = store.current
+    kb_path.write_text('{"format": 1, "version": "broken"', encoding='utf-8')
+    assert not store.reload()
+    assert store.current is current
+    assert isinstance(store.last_error, ValueError)
+    export_knowledge_base(str(kb_path), '3')
+    assert store.maybe_reload()
+    assert store.current.version == '3'
+    assert store.last_error is None
@@ -0,0 +1,96 @@
+# test_model_comparison.py
+# Description: Tests for the Section H likelihood ratio, Wald and score runner.
+# Run with: python -m pytest -q
+
+import math
+import random
+
+import pytest
+
+from _numerics import cho_solve, cholesky
+from model_comparison import _synthetic_pairs, compare_nested, run_comparisons
+
+def _design(n=200, seed=3):
+    rng = random.Random(seed)
+    full = [[1.0, rng.gauss(0.0, 1.0), rng.gauss(0.0, 1.0)] for _ in range(n)]
+    return rng, full, [row[:1] for row in full]
+
+
+def test_gaussian_trinity_matches_ols():
+    rng, full, restricted = _design()
+    y = [0.5 + 0.3 * row[2] + rng.gauss(0.0, 1.0) for row in full]
+    n = len(y)
+
+    def rss(x):
+        l = cholesky([[sum(r[a] * r[c] for r in x) for c in range(len(x[0]))] for a in range(len(x[0]))])
+        beta = cho_solve(l, [sum(r[a] * v for r, v in zip(x, y)) for a in range(len(x[0]))])
+        return sum((v - sum(b * w for b, w in zip(beta, r))) ** 2 for r, v in zip(x, y))
+
+    rss_restricted, rss_full = rss(restricted), rss(full)
+    result = compare_nested(y, restricted, full, family='gaussian')
+    assert result['df'] == 2
+    assert result['lrt'] == pytest.approx(n * math.log(rss_restricted / rss_full), rel=1e-9)
+    assert result['wald'] == pytest.approx(n * (rss_restricted - rss_full) / rss_full, rel=1e-9)
+    assert result['score'] == pytest.approx(n * (rss_restricted - rss_full) / rss_restricted, rel=1e-9)
+
+
+@pytest.mark.parametrize('family', ['binomial', 'poisson'])
+def test_glm_intercept_only_restricted_fit(family):
+    rng, full, restricted = _design()
+    if family == 'binomial':
+        y = [1.0 if rng.random() < 1.0 / (1.0 + math.exp(-0.6 * row[1])) else 0.0 for row in full]
+        mean = sum(y) / len(y)
+        expected = len(y) * (mean * math.log(mean) + (1.0 - mean) * math.log(1.0 - mean))
+    else:
+        y = [float(sum(1 for _ in range(10) if rng.random() < math.exp(0.4 * row[1]) / 10.0)) for row in full]
+        mean = sum(y) / len(y)
+        expected = sum(v * math.log(mean) - mean - math.lgamma(v + 1.0) for v in y)
+    result = compare_nested(y, restricted, full, family=family)
+    assert result['converged']
+    assert result['loglik_restricted'] == pytest.approx(expected, rel=1e-9)
+    assert result['lrt'] == pytest.approx(2.0 * (result['loglik_full'] - result['loglik_restricted']))
+    # The three statistics are asymptotically equivalent.
+    assert result['wald'] == pytest.approx(result['lrt'], rel=0.2)
+    assert result['score'] == pytest.approx(result['lrt'], rel=0.2)
+
+
+def test_model_comparison_error_paths():
+    _, full, restricted = _design(n=10)
+    y = [0.0] * 10
+    with pytest.raises(ValueError, match="not nested"):
+        compare_nested(y, [[2.0] for _ in range(10)], full)
+    with pytest.raises(ValueError, match="adds no columns"):
+        compare_nested(y, restricted, restricted)
+    with pytest.raises(ValueError, match="Unknown family"):
+        compare_nested(y, restricted, full, family='gamma')
+
+
+def test_intercept_in_any_column_position():
+    # The restricted design lists a large-valued covariate before the intercept.
+    rng = random.Random(8)
+    x = [rng.uniform(499.0, 501.0) for _ in range(150)]
+    z = [rng.gauss(0.0, 1.0) for _ in range(150)]
+    y = [float(rng.randrange(4)) for _ in range(150)]
+    leading = compare_nested(y, [[1.0, a] for a in x], [[1.0, a, b] for a, b in zip(x, z)], family='poisson')
+    trailing = compare_nested(y, [[a, 1.0] for a in x], [[a, 1.0, b] for a, b in zip(x, z)], family='poisson')
+    assert trailing['converged']
+    for key in ('lrt', 'wald', 'score', 'loglik_full'):
+        assert trailing[key] == pytest.approx(leading[key], rel=1e-6)
+
+
+def test_non_convergence_is_reported():
+    # Complete separation: the full logistic fit has no finite maximum.
+    rng = random.Random(9)
+    x = [rng.gauss(0.0, 1.0) for _ in range(60)]
+    y = [1.0 if v > 0.0 else 0.0 for v in x]
+    result = compare_nested(y, [[1.0] for _ in x], [[1.0, v] for v in x], max_iter=25)
+    assert result['converged_restricted']
+    assert not result['converged_full']
+    assert not result['converged']
+    assert result['iterations_full'] == 25
+
+
+def test_run_comparisons_matches_single_pairs():
+    pairs = _synthetic_pairs(3, 120, 'binomial')
+    batched = run_comparisons(pairs, 'binomial', processes=1)
+    assert batched == [compare_nested(y, restricted, full) for y, restricted, full in pairs]
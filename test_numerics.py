@@ -0,0 +1,99 @@
+# test_numerics.py
+# Description: Reference-value tests for the shared numerics (_numerics) and the
+# Section F survival analysis module.
+# Run with: python -m pytest -q
+
+import math
+import random
+
+import pytest
+
+from _numerics import (betainc, chi2_sf, cho_inverse, cho_solve, cholesky, f_sf, gammaincc,
+                       normal_sf, quadratic_form)
+from survival_analysis import cox_ph, logrank_test
+
+# --- DISTRIBUTION TAILS ---
+
+def test_chi2_and_gamma_tails():
+    assert chi2_sf(3.841458820694124, 1) == pytest.approx(0.05, rel=1e-9)
+    assert chi2_sf(5.991464547107979, 2) == pytest.approx(0.05, rel=1e-9)
+    assert chi2_sf(30.0, 2) == pytest.approx(math.exp(-15.0), rel=1e-9)
+    assert gammaincc(1.0, 2.5) == pytest.approx(math.exp(-2.5), rel=1e-12)
+
+
+def test_beta_f_and_normal_tails():
+    assert betainc(2.0, 3.0, 0.4) == pytest.approx(0.5248, rel=1e-10)
+    assert betainc(1.0, 4.0, 0.3) == pytest.approx(1.0 - 0.7 ** 4, rel=1e-10)
+    assert f_sf(4.9646027437307145, 1, 10) == pytest.approx(0.05, rel=1e-8)
+    assert normal_sf(1.959963984540054) == pytest.approx(0.025, rel=1e-9)
+    assert normal_sf(0.0) == pytest.approx(0.5)
+
+# --- CHOLESKY HELPERS ---
+
+def test_cholesky_helpers():
+    a = [[4.0, 2.0, 0.6], [2.0, 5.0, 1.0], [0.6, 1.0, 3.0]]
+    b = [1.0, -2.0, 0.5]
+    l = cholesky(a)
+    x = cho_solve(l, b)
+    for row, expected in zip(a, b):
+        assert sum(r * v for r, v in zip(row, x)) == pytest.approx(expected)
+    inverse = cho_inverse(l)
+    for i in range(3):
+        for j in range(3):
+            assert sum(a[i][k] * inverse[k][j] for k in range(3)) == pytest.approx(float(i == j), abs=1e-12)
+    assert quadratic_form(l, b) == pytest.approx(sum(u * v for u, v in zip(b, x)))
+
+
+def test_cholesky_rejects_indefinite_matrix():
+    with pytest.raises(ValueError):
+        cholesky([[1.0, 2.0], [2.0, 1.0]])
+
+# --- SURVIVAL ANALYSIS ---
+
+def _cohort(n=60, seed=7):
+    rng = random.Random(seed)
+    groups = [i % 2 for i in range(n)]
+    times = [rng.expovariate(1.0 + 0.8 * g) for g in groups]  # Continuous, so no tied times.
+    events = [1 if rng.random() < 0.8 else 0 for _ in range(n)]
+    return times, events, groups
+
+
+def test_logrank_equals_cox_score_test():
+    times, events, groups = _cohort()
+    logrank = logrank_test(times, events, groups)
+    cox = cox_ph(times, events, [[float(g)] for g in groups])
+    assert logrank['statistic'] == pytest.approx(cox['score'], rel=1e-9)
+    assert sum(logrank['observed'].values()) == pytest.approx(sum(events))
+    assert sum(logrank['expected'].values()) == pytest.approx(sum(events))
+
+
+def test_cox_maximizes_partial_likelihood():
+    times, events, groups = _cohort()
+    x = [float(g) for g in groups]
+
+    def partial_loglik(beta):
+        total = 0.0
+        for i, (t, event) in enumerate(zip(times, events)):
+            if event:
+                risk = sum(math.exp(beta * x[j]) for j in range(len(times)) if times[j] >= t)
+                total += beta * x[i] - math.log(risk)
+        return total
+
+    fit = cox_ph(times, events, [[v] for v in x])
+    beta = fit['coef'][0]
+    assert fit['loglik'] == pytest.approx(partial_loglik(beta), rel=1e-9)
+    assert partial_loglik(beta) > partial_loglik(beta + 1e-3)
+    assert partial_loglik(beta) > partial_loglik(beta - 1e-3)
+    assert fit['lrt'] == pytest.approx(2.0 * (partial_loglik(beta) - partial_loglik(0.0)), rel=1e-9)
+
+
+def test_survival_error_paths():
+    times, groups = [1.0, 2.0, 3.0, 4.0], [0, 1, 0, 1]
+    with pytest.raises(ValueError, match="No events"):
+        logrank_test(times, [0, 0, 0, 0], groups)
+    with pytest.raises(ValueError, match="No events"):
+        cox_ph(times, [0, 0, 0, 0], [[float(g)] for g in groups])
+    with pytest.raises(ValueError, match="two groups"):
+        logrank_test(times, [1, 1, 1, 1], [0, 0, 0, 0])
+    with pytest.raises(ValueError, match="length"):
+        logrank_test(times, [1, 1, 1], groups)
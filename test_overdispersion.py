@@ -0,0 +1,88 @@
+# test_overdispersion.py
+# Description: Tests for the streaming Section C overdispersion diagnostic.
+# Run with: python -m pytest -q
+
+import math
+import random
+import statistics
+
+import pytest
+
+from overdispersion import (NEGATIVE_BINOMIAL_KEY, POISSON_KEY, RunningMoments, _irls_pass,
+                            diagnose_overdispersion, fit_poisson_streaming, read_csv_chunks)
+
+
+def _source(counts, rows=None, size=7):
+    rows = rows if rows is not None else [[] for _ in counts]
+    return lambda: ((counts[i:i + size], rows[i:i + size] if rows[0] else []) for i in range(0, len(counts), size))
+
+
+def test_running_moments_match_statistics():
+    rng = random.Random(1)
+    values = [rng.uniform(0.0, 10.0) for _ in range(101)]
+    moments = RunningMoments()
+    for start in range(0, len(values), 13):
+        moments.update(values[start:start + 13])
+    assert moments.mean == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert moments.variance == pytest.approx(statistics.variance(values), rel=1e-12)
+
+
+def test_irls_matches_closed_form_for_binary_covariate():
+    # With an intercept and one 0/1 covariate the Poisson MLE reproduces the group means.
+    rng = random.Random(2)
+    x = [i % 2 for i in range(200)]
+    counts = [float(sum(1 for _ in range(12) if rng.random() < (0.2 if g else 0.4))) for g in x]
+    mean0 = sum(c for c, g in zip(counts, x) if not g) / x.count(0)
+    mean1 = sum(c for c, g in zip(counts, x) if g) / x.count(1)
+    fit = fit_poisson_streaming(_source(counts, [[float(g)] for g in x]))
+    assert fit['coef'][0] == pytest.approx(math.log(mean0), rel=1e-9)
+    assert fit['coef'][1] == pytest.approx(math.log(mean1 / mean0), rel=1e-9)
+    assert fit['df_resid'] == 198
+
+
+def test_intercept_only_fit_without_covariate_rows():
+    counts = [float(v) for v in (0, 1, 2, 3, 5, 8, 1, 2, 0, 4)]
+    fit = fit_poisson_streaming(_source(counts))
+    assert fit['coef'] == [pytest.approx(math.log(statistics.fmean(counts)), rel=1e-9)]
+    marginal = diagnose_overdispersion(_source(counts), covariates=False)
+    assert diagnose_overdispersion(_source(counts))['dispersion'] == pytest.approx(marginal['dispersion'], rel=1e-9)
+
+
+def test_statistics_match_returned_coefficients_at_max_iter():
+    rng = random.Random(3)
+    rows = [[rng.gauss(0.0, 1.0)] for _ in range(100)]
+    counts = [float(rng.randrange(6)) for _ in rows]
+    source = _source(counts, rows)
+    fit = fit_poisson_streaming(source, max_iter=1)
+    _, _, deviance, pearson, _ = _irls_pass(source, fit['coef'], True)
+    assert fit['deviance'] == pytest.approx(deviance, rel=1e-12)
+    assert fit['pearson_chi2'] == pytest.approx(pearson, rel=1e-12)
+
+
+def test_diagnosis_recommends_negative_binomial_for_overdispersed_counts(tmp_path):
+    rng = random.Random(4)
+    counts = [rng.choice((0, 0, 0, 1, 2, 15, 30)) for _ in range(300)]
+    path = tmp_path / 'counts.csv'
+    path.write_text('y\n' + '\n'.join(map(str, counts)) + '\n')
+    diagnosis = diagnose_overdispersion(read_csv_chunks(str(path), 'y', chunk_size=50))
+    assert diagnosis['answer'] == 'y'
+    assert diagnosis['tests'] == [POISSON_KEY, NEGATIVE_BINOMIAL_KEY]
+    assert diagnosis['dispersion'] == pytest.approx(statistics.variance(counts) / statistics.fmean(counts), rel=1e-9)
+
+
+def test_error_paths():
+    with pytest.raises(ValueError, match="No observations"):
+        diagnose_overdispersion(lambda: iter(()), covariates=False)
+    with pytest.raises(ValueError, match="No observations"):
+        diagnose_overdispersion(lambda: iter(()))
+    with pytest.raises(ValueError, match="All counts are zero"):
+        diagnose_overdispersion(_source([0.0, 0.0, 0.0]), covariates=False)
+    for covariates in (True, False):
+        with pytest.raises(ValueError, match="more observations than fitted parameters"):
+            diagnose_overdispersion(_source([3.0]), covariates=covariates)
+    with pytest.raises(ValueError, match="more observations than fitted parameters"):
+        diagnose_overdispersion(_source([3.0, 1.0], [[1.0], [2.0]]))
+    with pytest.raises(ValueError, match="cannot identify"):
+        fit_poisson_streaming(_source([3.0], [[1.0]]))
+    with pytest.raises(ValueError, match="disagree"):
+        fit_poisson_streaming(lambda: iter([([1.0], []), ([2.0], [[1.0]])]))
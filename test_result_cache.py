@@ -0,0 +1,119 @@
+# test_result_cache.py
+# Description: Tests for the fingerprinted, size-bounded assumption-check cache.
+# Run with: python -m pytest -q
+
+import os
+import random
+import time
+from array import array
+
+import pytest
+
+import result_cache
+from knowledge_base import KnowledgeBase, document_from_guide
+from result_cache import ResultCache, cached_parametric_check, fingerprint
+
+ONE_SAMPLE = ['a', '1', '1']  # Up to "Are parametric assumptions met?".
+
+
+def test_fingerprint_distinguishes_values_and_types():
+    assert fingerprint([1.0, 2.0]) == fingerprint((1.0, 2.0))
+    assert fingerprint([1.0, 2.0]) != fingerprint([2.0, 1.0])
+    assert fingerprint(array('d', [1.0, 2.0])) != fingerprint(array('d', [2.0, 1.0]))
+    assert fingerprint([2 ** 53 + 1]) != fingerprint([2 ** 53])
+    assert fingerprint([1]) != fingerprint([1.0])
+    assert fingerprint([10 ** 30]) != fingerprint([10 ** 30 + 1])  # Beyond 64 bits: no OverflowError.
+    assert fingerprint(['a', 'b']) != fingerprint(['ab'])
+    assert fingerprint([1.0], [2.0]) != fingerprint([1.0, 2.0])
+    assert fingerprint([1.0], alpha=0.05) != fingerprint([1.0], alpha=0.01)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'answer': 'y'}
+    assert cache.get('k') is None
+    assert cache.get_or_compute('k', compute) == {'answer': 'y'}
+    assert cache.get_or_compute('k', compute) == {'answer': 'y'}
+    assert len(calls) == 1
+    assert ResultCache(str(tmp_path)).get('k') == {'answer': 'y'}  # Shared through the directory.
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=350)
+    value = ['x' * 90]  # About 100 bytes on disk.
+    for number, key in enumerate('abc'):
+        cache.put(key, value)
+        os.utime(cache._path(key), (number, number))  # Distinct, increasing access times.
+    assert cache.get('a') == value  # Refreshes 'a', leaving 'b' the oldest.
+    cache.put('d', value)
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == [value] * 3
+    assert sum(entry.stat().st_size for entry in os.scandir(tmp_path)) <= 350
+
+
+def test_other_processes_writes_are_counted_on_rescan(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'RESCAN_EVERY', 2)
+    cache = ResultCache(str(tmp_path), max_bytes=200)
+    (tmp_path / 'foreign.json').write_text('"' + 'x' * 199 + '"')  # Written after this process's scan.
+    os.utime(tmp_path / 'foreign.json', (0, 0))
+    cache.put('a', 1)  # The estimate is still within budget: no scan.
+    assert (tmp_path / 'foreign.json').exists()
+    cache.put('b', 2)
+    assert not (tmp_path / 'foreign.json').exists()
+    assert cache.get('a') == 1 and cache.get('b') == 2
+
+
+def test_stale_temporary_files_are_removed(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=0)
+    stale, fresh = tmp_path / '.stale.1.1.tmp', tmp_path / '.fresh.1.1.tmp'
+    stale.write_text('{')
+    fresh.write_text('{')
+    old = time.time() - 2 * result_cache.TEMPORARY_MAX_AGE
+    os.utime(stale, (old, old))
+    cache.put('k', 1)
+    assert not stale.exists()
+    assert fresh.exists()  # May belong to a writer that is still running.
+
+
+def test_cached_parametric_check_with_recommendation(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    rng = random.Random(5)
+    values = [rng.gauss(10.0, 2.0) for _ in range(200)]
+    result = cached_parametric_check(cache, values, answers_before=ONE_SAMPLE, answers_after=['n'])
+    assert result['answer'] == 'y'
+    assert result['recommendation'] == ["1. One-Sample t-test (P)"]
+    partial = cached_parametric_check(cache, values, answers_before=ONE_SAMPLE)
+    assert sorted(partial['recommendation']) == ["1. One-Sample t-test (P)", "9. Z-test (for means) (P)"]
+    assert cached_parametric_check(cache, values, answers_before=ONE_SAMPLE, answers_after=['n']) == result
+
+
+def test_invalid_answer_paths_are_rejected(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    values = [1.0, 2.0, 3.0, 5.0]
+    with pytest.raises(ValueError, match=r"\['a', '9'\]"):
+        cached_parametric_check(cache, values, answers_before=['a', '9'])
+    with pytest.raises(ValueError, match="already complete"):
+        cached_parametric_check(cache, values, answers_before=['a', '1', '1', 'n'])
+    with pytest.raises(ValueError, match="not a path"):
+        cached_parametric_check(cache, values, answers_before=ONE_SAMPLE, answers_after=['z'])
+
+
+def test_tree_version_is_part_of_the_key(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    values = [float(v) for v in range(1, 40)]
+    document = document_from_guide('1')
+    original = KnowledgeBase(document)
+    question = document['tree']['children']['a']['children']['1']['children']['1']
+    question['children']['n']['tests'] = ["14. Sign Test (NP)"]
+    question['children']['y']['children']['y']['tests'] = ["1. One-Sample t-test (P)"]
+    edited = KnowledgeBase(document)
+    before = cached_parametric_check(cache, values, answers_before=ONE_SAMPLE, knowledge_base=original)
+    after = cached_parametric_check(cache, values, answers_before=ONE_SAMPLE, knowledge_base=edited)
+    assert before['answer'] == after['answer']
+    assert before['recommendation'] != after['recommendation']
+    assert len(list(tmp_path.iterdir())) == 2
+    assert cached_parametric_check(cache, values) == {k: v for k, v in before.items() if k != 'recommendation'}
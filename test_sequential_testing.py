@@ -0,0 +1,82 @@
+# test_sequential_testing.py
+# Description: Tests for the online two-arm experiment state and its p-values.
+# Run with: python -m pytest -q
+
+import math
+import random
+
+import pytest
+
+from sequential_testing import (CHI_SQUARED_KEY, FISHER_KEY, Z_TEST_KEY, SequentialExperiments,
+                                fisher_exact_2x2)
+
+
+def _fisher_brute_force(a, b, c, d):
+    row0, col0, n = a + b, a + c, a + b + c + d
+
+    def probability(k):
+        return math.comb(col0, k) * math.comb(n - col0, row0 - k) / math.comb(n, row0)
+    observed = probability(a)
+    return sum(probability(k) for k in range(max(0, row0 + col0 - n), min(row0, col0) + 1)
+               if probability(k) <= observed * (1.0 + 1e-7))
+
+
+@pytest.mark.parametrize('table', [(3, 1, 1, 3), (1, 9, 11, 3), (7, 17, 15, 5), (0, 5, 5, 0), (10, 10, 10, 10)])
+def test_fisher_exact_matches_hypergeometric_sum(table):
+    assert fisher_exact_2x2(*table) == pytest.approx(_fisher_brute_force(*table), rel=1e-9)
+
+
+def test_fisher_exact_tea_tasting():
+    assert fisher_exact_2x2(3, 1, 1, 3) == pytest.approx(17.0 / 35.0, rel=1e-12)
+
+
+def test_always_valid_p_value_is_running_minimum_of_mixture_ratio():
+    tau, burn_in = 0.1, 20
+    experiments = SequentialExperiments(tau=tau, burn_in=burn_in)
+    experiment = experiments.new_experiment()
+    rng = random.Random(11)
+    counts = [[0, 0], [0, 0]]
+    expected = 1.0
+    for step in range(2000):
+        arm = step % 2
+        success = rng.random() < (0.3 if arm else 0.2)
+        counts[arm][0] += 1
+        counts[arm][1] += success
+        p_value = experiments.record(experiment, arm, success)
+
+        (n0, x0), (n1, x1) = counts
+        if n0 >= burn_in and n1 >= burn_in:
+            p0, p1 = x0 / n0, x1 / n1
+            variance = p0 * (1.0 - p0) / n0 + p1 * (1.0 - p1) / n1
+            total = variance + tau * tau
+            ratio = math.sqrt(variance / total) * math.exp((p1 - p0) ** 2 * tau * tau / (2.0 * variance * total))
+            expected = min(expected, 1.0 / ratio)
+        assert p_value == pytest.approx(expected, rel=1e-9)
+    assert experiments.always_valid_p_value(experiment) < 0.01
+
+
+def test_statistics_and_recommendation():
+    experiments = SequentialExperiments()
+    small, large = experiments.new_experiments(2)
+    experiments.record_batch([(small, 0, True), (small, 0, False), (small, 1, True), (small, 1, True)])
+    assert experiments.statistics(small)['recommended'] == [FISHER_KEY]
+    assert experiments.fisher_exact(small) == pytest.approx(fisher_exact_2x2(1, 1, 2, 0))
+    experiments.record_batch((large, i % 2, i % 3 == 0) for i in range(400))
+    statistics = experiments.statistics(large)
+    assert statistics['trials'] == (200, 200)
+    assert statistics['recommended'] == [Z_TEST_KEY, CHI_SQUARED_KEY]
+    assert statistics['chi2'] == pytest.approx(statistics['z'] ** 2)
+    assert experiments.statistics(small)['trials'] == (2, 2)  # Untouched by the other experiment.
+
+
+def test_out_of_range_ids_and_arms_are_rejected():
+    experiments = SequentialExperiments()
+    first, _ = experiments.new_experiments(2)
+    for experiment, arm in ((first, 2), (first, -1), (-1, 0), (2, 0)):
+        with pytest.raises(ValueError):
+            experiments.record(experiment, arm, True)
+    with pytest.raises(ValueError):
+        experiments.statistics(5)
+    with pytest.raises(ValueError):
+        experiments.always_valid_p_value(-1)
+    assert list(experiments.trials) == [0, 0, 0, 0]
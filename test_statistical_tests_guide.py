@@ -0,0 +1,70 @@
+# test_statistical_tests_guide.py
+# Description: Tests for the guide's non-interactive one-shot mode.
+# Run with: python -m pytest -q
+
+import threading
+
+import pytest
+
+import statistical_tests_guide as guide
+from statistical_tests_guide import ask_question, print_recommendation
+
+# Replacement section handlers call ask_question/print_recommendation by bare name, like the
+# real ones: one-shot mode runs a handler's code against its own copy of the guide's globals.
+
+
+def test_complete_path_prints_only_the_recommendation(capsys):
+    assert guide.run_one_shot(['a', '1', '3', 'r', 'n']) == 0
+    captured = capsys.readouterr()
+    assert captured.out == guide.format_recommendation("13. Friedman Test (NP)") + "\n"
+    assert captured.err == ""
+    assert guide.run_one_shot(['a,1,3', 'R', 'n']) == 0
+    assert capsys.readouterr().out == captured.out
+
+
+@pytest.mark.parametrize('answers, message', [
+    (['a', '1'], "More answers needed"),
+    (['a', '9'], "Invalid answer '9'"),
+    (['z'], "Invalid answer 'z'"),
+    (['a', '1', '3', 'r', 'n', 'x'], "Unexpected extra answers"),
+])
+def test_bad_answers_exit_with_status_2(capsys, answers, message):
+    assert guide.run_one_shot(answers) == 2
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert message in captured.err
+
+
+def test_path_without_recommendation_exits_with_status_1(monkeypatch, capsys):
+    def handle_section_h():
+        ask_question("H1. Anything?", {'x': "Anything"})
+        return False
+    monkeypatch.setattr(guide, 'handle_section_h', handle_section_h)
+    assert guide.run_one_shot(['h', 'x']) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "No specific test identified" in captured.err
+
+
+def test_interactive_sessions_are_unaffected(monkeypatch, capsys):
+    original = guide.ask_question, guide.print_recommendation
+    replies = iter(['b'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(replies))
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow_section_a():
+        started.set()
+        release.wait(5)
+        return print_recommendation("1. One-Sample t-test (P)")
+    monkeypatch.setattr(guide, 'handle_section_a', slow_section_a)
+    worker = threading.Thread(target=lambda: results.append(guide.run_one_shot(['a'])))
+    worker.start()
+    started.wait(5)
+    # While a one-shot run is in progress, the module's own functions stay interactive.
+    assert (guide.ask_question, guide.print_recommendation) == original
+    assert guide.ask_question("Live question?", {'a': "A", 'b': "B"}) == 'b'
+    release.set()
+    worker.join()
+    assert results == [0]
+    assert "Live question?" in capsys.readouterr().out
@@ -0,0 +1,79 @@
+# test_variance_tests.py
+# Description: Reference-value tests for the batched Section G variance tests.
+# Run with: python -m pytest -q
+
+import random
+
+import pytest
+
+from _numerics import f_sf
+from variance_tests import batch_variance_tests, group_index
+
+SCIPY_A = [8.88, 9.12, 9.04, 8.98, 9.00, 9.08, 9.01, 8.85, 9.06, 8.99]
+SCIPY_B = [8.88, 8.95, 9.29, 9.44, 9.15, 9.58, 8.36, 9.18, 8.67, 9.05]
+SCIPY_C = [8.95, 9.12, 8.95, 8.85, 9.03, 8.84, 9.07, 8.98, 8.86, 8.98]
+
+
+def _anova_f(groups):
+    values = [v for group in groups for v in group]
+    grand = sum(values) / len(values)
+    between = sum(len(g) * (sum(g) / len(g) - grand) ** 2 for g in groups) / (len(groups) - 1)
+    within = sum((v - sum(g) / len(g)) ** 2 for g in groups for v in g) / (len(values) - len(groups))
+    return between / within
+
+
+def test_variance_tests_match_scipy_example():
+    # scipy.stats.levene (default center='median') and scipy.stats.bartlett docstring example.
+    data = [(v,) for v in SCIPY_A + SCIPY_B + SCIPY_C]
+    labels = ['a'] * 10 + ['b'] * 10 + ['c'] * 10
+    results = batch_variance_tests(data, labels)
+    statistic, p_value = results['brown_forsythe'][0]
+    assert statistic == pytest.approx(7.584952754501659, rel=1e-9)
+    assert p_value == pytest.approx(0.002431505967249681, rel=1e-6)
+    statistic, p_value = results['bartlett'][0]
+    assert statistic == pytest.approx(22.789434813726768, rel=1e-9)
+    assert p_value == pytest.approx(1.1254782518834628e-05, rel=1e-6)
+
+    groups = (SCIPY_A, SCIPY_B, SCIPY_C)
+    mean_deviations = [[abs(v - sum(g) / len(g)) for v in g] for g in groups]
+    assert results['levene'][0][0] == pytest.approx(_anova_f(mean_deviations), rel=1e-9)
+    assert 'f_test' not in results
+
+
+def test_f_test_for_two_groups():
+    data = [(v,) for v in SCIPY_A + SCIPY_B]
+    ratio, p_value = batch_variance_tests(data, [0] * 10 + [1] * 10)['f_test'][0]
+
+    def variance(values):
+        mean = sum(values) / len(values)
+        return sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    assert ratio == pytest.approx(variance(SCIPY_A) / variance(SCIPY_B), rel=1e-12)
+    assert p_value == pytest.approx(2.0 * (1.0 - f_sf(ratio, 9, 9)), rel=1e-9)
+
+
+def test_variance_error_paths():
+    with pytest.raises(ValueError, match="two observations"):
+        batch_variance_tests([(1.0,), (2.0,), (3.0,)], [0, 0, 1])
+    with pytest.raises(ValueError, match="two groups"):
+        batch_variance_tests([(1.0,), (2.0,)], [0, 0])
+    with pytest.raises(ValueError, match="rows"):
+        batch_variance_tests([(1.0,), (2.0,)], [0, 0, 1])
+
+
+
+def test_columns_are_tested_independently():
+    rng = random.Random(5)
+    labels = [i % 3 for i in range(90)]
+    columns = [[rng.gauss(0.0, 1.0 + g) for g in labels] for _ in range(4)]
+    batched = batch_variance_tests(list(zip(*columns)), labels)
+    for c, column in enumerate(columns):
+        single = batch_variance_tests([(v,) for v in column], labels)
+        for name in ('levene', 'brown_forsythe', 'bartlett'):
+            assert batched[name][c] == pytest.approx(single[name][0], rel=1e-12)
+
+
+def test_group_index():
+    order, bounds, levels = group_index(['b', 'a', 'b', 'c', 'a'])
+    assert levels == ['a', 'b', 'c']
+    assert bounds == [0, 2, 4, 5]
+    assert [order[bounds[g]:bounds[g + 1]] for g in range(3)] == [[1, 4], [0, 2], [3]]
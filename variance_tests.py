@@ -0,0 +1,146 @@
+# variance_tests.py
+# Description: Batched Section G variance-homogeneity tests ("34. F-test for
+# Equality of Variances (P)", "35. Levene's Test", "36. Bartlett's Test (P)" and
+# "37. Brown-Forsythe Test") for every column of a wide matrix split by one
+# grouping vector. The grouping vector is sorted once. Each column is then
+# gathered group by group; per group, one sort gives the median and a single loop
+# accumulates the sums of absolute and squared deviations from the mean and the
+# median, from which all four statistics follow.
+
+import math
+
+from _numerics import chi2_sf, f_sf
+
+TEST_KEYS = {
+    'f_test': "34. F-test for Equality of Variances (P)",
+    'levene': "35. Levene's Test",
+    'bartlett': "36. Bartlett's Test (P)",
+    'brown_forsythe': "37. Brown-Forsythe Test",
+}
+
+NAN = float('nan')
+
+
+def group_index(groups):
+    """
+    Sorts the grouping vector once.
+    Args:
+        groups (sequence): Group label for each row.
+    Returns:
+        tuple: (order, bounds, levels) where order lists row indices grouped
+               together and bounds[g]:bounds[g + 1] is group g's slice of order.
+    """
+    levels = sorted(set(groups), key=repr)
+    lookup = {level: code for code, level in enumerate(levels)}
+    codes = [lookup[label] for label in groups]
+    order = sorted(range(len(codes)), key=codes.__getitem__)
+    bounds = [0] * (len(levels) + 1)
+    for code in codes:
+        bounds[code + 1] += 1
+    for g in range(len(levels)):
+        bounds[g + 1] += bounds[g]
+    return order, bounds, levels
+
+
+def _median(sorted_values):
+    m = len(sorted_values)
+    half = m // 2
+    if m % 2:
+        return sorted_values[half]
+    return 0.5 * (sorted_values[half - 1] + sorted_values[half])
+
+
+def _anova_f(sums, squares, sizes, total):
+    """
+    One-way ANOVA F statistic on absolute deviations (the Levene family), from
+    each group's sum of deviations and sum of squared deviations.
+    """
+    k = len(sizes)
+    group_means = [s / n for s, n in zip(sums, sizes)]
+    grand = sum(sums) / total
+    between = sum(n * (m - grand) ** 2 for m, n in zip(group_means, sizes))
+    within = sum(q - s * m for q, s, m in zip(squares, sums, group_means))
+    if within <= 0.0:
+        return NAN
+    return (total - k) * between / ((k - 1) * within)
+
+
+def _column_tests(column, order, bounds):
+    """All four statistics for one column, using the shared group order."""
+    k = len(bounds) - 1
+    total = bounds[-1]
+    sizes = [bounds[g + 1] - bounds[g] for g in range(k)]
+    mean_sums, mean_squares, median_sums, median_squares = [], [], [], []
+    for g in range(k):
+        values = sorted([column[i] for i in order[bounds[g]:bounds[g + 1]]])
+        mean = sum(values) / sizes[g]
+        median = _median(values)
+        mean_sum = mean_square = median_sum = median_square = 0.0
+        for v in values:
+            d = abs(v - mean)
+            e = abs(v - median)
+            mean_sum += d
+            mean_square += d * d
+            median_sum += e
+            median_square += e * e
+        mean_sums.append(mean_sum)
+        mean_squares.append(mean_square)
+        median_sums.append(median_sum)
+        median_squares.append(median_square)
+    variances = [q / (n - 1) for q, n in zip(mean_squares, sizes)]
+
+    df = k - 1
+    results = {}
+
+    levene = _anova_f(mean_sums, mean_squares, sizes, total)
+    results['levene'] = (levene, f_sf(levene, df, total - k))
+    brown_forsythe = _anova_f(median_sums, median_squares, sizes, total)
+    results['brown_forsythe'] = (brown_forsythe, f_sf(brown_forsythe, df, total - k))
+
+    if min(variances) > 0.0:
+        pooled = sum((n - 1) * v for n, v in zip(sizes, variances)) / (total - k)
+        numerator = (total - k) * math.log(pooled) - sum((n - 1) * math.log(v) for n, v in zip(sizes, variances))
+        correction = 1.0 + (sum(1.0 / (n - 1) for n in sizes) - 1.0 / (total - k)) / (3.0 * df)
+        bartlett = numerator / correction
+        results['bartlett'] = (bartlett, chi2_sf(bartlett, df))
+    else:
+        results['bartlett'] = (NAN, NAN)
+
+    if k == 2:
+        if variances[1] > 0.0:
+            ratio = variances[0] / variances[1]
+            upper = f_sf(ratio, sizes[0] - 1, sizes[1] - 1)
+            results['f_test'] = (ratio, min(1.0, 2.0 * min(upper, 1.0 - upper)))
+        else:
+            results['f_test'] = (NAN, NAN)
+    return results
+
+
+def batch_variance_tests(data, groups):
+    """
+    Runs every Section G variance test on every column of a matrix.
+    Args:
+        data (sequence): Rows of the matrix (each row a sequence of feature values).
+        groups (sequence): Group label for each row.
+    Returns:
+        dict: Keys 'levene', 'brown_forsythe', 'bartlett' and (for exactly two
+              groups) 'f_test', each mapping to a list with one
+              (statistic, p_value) tuple per column. Undefined statistics
+              (e.g. a zero-variance group) are reported as NaN.
+    """
+    if len(data) != len(groups):
+        raise ValueError(f"'data' has {len(data)} rows but 'groups' has {len(groups)} labels.")
+    order, bounds, levels = group_index(groups)
+    if len(levels) < 2:
+        raise ValueError("At least two groups are needed to compare variances.")
+    if min(bounds[g + 1] - bounds[g] for g in range(len(levels))) < 2:
+        raise ValueError("Every group needs at least two observations.")
+
+    results = {name: [] for name in ('levene', 'brown_forsythe', 'bartlett')}
+    if len(levels) == 2:
+        results['f_test'] = []
+    # zip(*data) yields one column at a time, so working memory stays O(rows).
+    for column in zip(*data):
+        for name, value in _column_tests(column, order, bounds).items():
+            results[name].append(value)
+    return results